@@ -2,13 +2,20 @@ from ai.generic_result import GenericResult
 
 
 class AStarResult(GenericResult):
-    def __init__(self, solution=None, failure=False, num_expanded_nodes=0, max_depth=0):
+    def __init__(self, solution=None, failure=False, num_expanded_nodes=0, max_depth=0, 
+            worker_num_expanded_nodes=None, bound=1):
         """Initializes the AStarResult class, which encapsulates results
         from the A*GS algorithm. This includes the number of expanded nodes 
         and the max depth reached by the algorithm, which are used in 
         calculating the effective branching factor.
+
+        Parallel searches also set worker_num_expanded_nodes, a list of the 
+        number of nodes expanded by each worker process. bound is the suboptimality
+        bound of the solution: its length is at most bound times the optimal length.
         """
         self.solution = solution
         self.failure = failure
         self.num_expanded_nodes = num_expanded_nodes
         self.max_depth = max_depth
+        self.worker_num_expanded_nodes = worker_num_expanded_nodes
+        self.bound = bound
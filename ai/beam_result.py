@@ -0,0 +1,13 @@
+from ai.generic_result import GenericResult
+
+
+class BeamResult(GenericResult):
+    def __init__(self, solution=None, failure=False, num_pruned_nodes=0):
+        """Initializes the BeamResult class, which encapsulates results
+        from the beam search algorithm. This includes the number of nodes 
+        pruned because they did not fit in the beam, which trades off against 
+        the quality of the solution.
+        """
+        self.solution = solution
+        self.failure = failure
+        self.num_pruned_nodes = num_pruned_nodes
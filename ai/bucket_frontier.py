@@ -0,0 +1,101 @@
+from collections import deque
+
+
+class BucketFrontier():
+    def __init__(self, lifo=True):
+        """Initializes the BucketFrontier (bucket queue) class, a priority queue 
+        for small non-negative integer priorities such as f-costs.
+        
+        Bucket n holds the entries with priority n, so inserting, removing (and 
+        therefore decreasing a key) and popping are O(1) apart from skipping past 
+        empty buckets. Nodes sharing a priority are popped in LIFO order if lifo is 
+        True, which favours deeper nodes among equal f-costs, and FIFO otherwise.
+        
+        Offers the same interface as PriorityFrontier.
+        """
+        self.lifo = lifo
+
+        # Deques of [priority, node] entries, indexed by priority
+        # Entries of removed nodes stay in their bucket with their node set to None
+        #  and are dropped when they are reached
+        self.buckets = []
+
+        # Lowest priority whose bucket may hold a live entry
+        self.min_priority = 0
+
+        # Entries of the nodes that are currently in the queue, keyed by node
+        self.node_dict = {}
+
+
+    def __contains__(self, node):
+        return node in self.node_dict
+
+
+    def __len__(self):
+        return len(self.node_dict)
+
+
+    def peek_node(self, node):
+        """Returns the node equal to the given node from the frontier.
+        
+        This function assumes that the given node is in the frontier.
+        """
+        return self.node_dict[node][-1]
+        
+
+    def peek_heuristic(self, node):
+        """Returns the priority of the node equal to the given node from the frontier.
+        
+        This function assumes that the given node is in the frontier.
+        """
+        return self.node_dict[node][0]
+        
+
+    def is_empty(self):
+        """Returns True if the frontier is empty, False otherwise."""
+        return len(self.node_dict) == 0
+    
+
+    def insert(self, node, heuristic):
+        """Adds the given node to the frontier with the given non-negative integer 
+        priority, replacing any equal node.
+        """
+        if node in self.node_dict:
+            self.remove_node(node)
+
+        # Add buckets up to this priority
+        while len(self.buckets) <= heuristic:
+            self.buckets.append(deque())
+
+        entry = [heuristic, node]
+        self.node_dict[node] = entry
+        self.buckets[heuristic].append(entry)
+
+        if heuristic < self.min_priority:
+            self.min_priority = heuristic
+
+
+    def remove_node(self, node):
+        """Removes the node equal to the given node from the frontier."""
+        entry = self.node_dict.pop(node)
+        entry[-1] = None
+
+
+    def pop(self):
+        """Removes & returns the element with the lowest priority from the frontier."""
+        while self.min_priority < len(self.buckets):
+            bucket = self.buckets[self.min_priority]
+
+            while bucket:
+                entry = bucket.pop() if self.lifo else bucket.popleft()
+                node = entry[-1]
+
+                if node is not None:
+                    # Skip entries of removed nodes
+                    del self.node_dict[node]
+                    return node
+            
+            # This bucket is exhausted, move on to the next priority
+            self.min_priority += 1
+        
+        return None
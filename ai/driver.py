@@ -1,33 +1,159 @@
 from ai.a_star_result import AStarResult
+from ai.beam_result import BeamResult
+from ai.bucket_frontier import BucketFrontier
 from ai.dls_result import DLSResult
+from ai.fingerprint_set import FingerprintSet
 from ai.frontier import Frontier
+from ai.frontier_type import FrontierType
 from ai.generic_result import GenericResult
+from ai.hda_star_worker import ACTION_CODE, HDAStarWorker
 from ai.heuristic import Heuristic
+from ai.node_arena import NO_PARENT, NodeArena
+from ai.phase import Phase
+from ai.pattern_database import PatternDatabase
 from ai.priority_frontier import PriorityFrontier
+from ai.record_file import RecordFile
 from ai.search_node import SearchNode
 from ai.solution import Solution
+from ai.telemetry import Telemetry
+from tj_wriggle.end import WrigglerEnd
+from collections import OrderedDict
+from heapq import merge, nsmallest
 from itertools import count
-from tj_wriggle.coordinate import Coordinate
+from queue import Empty
+from struct import Struct
+from time import perf_counter
+import multiprocessing
+import os
+import sys
+import tempfile
+
+
+# Constants
+# Heuristic value of states from which the goal cannot be reached
+# Such states are pruned as soon as they are generated
+UNREACHABLE = float('inf')
+
+# Number of states the IDA* transposition table remembers before evicting the least 
+#  recently used one
+DEFAULT_TRANSPOSITION_TABLE_SIZE = 2 ** 18
+
+# Heuristics costly enough to be memoized, and the number of states whose heuristic is
+#  remembered before evicting the least recently used one
+MEMOIZED_HEURISTICS = (Heuristic.NUM_OBSTACLES, Heuristic.PATTERN_DB)
+DEFAULT_HEURISTIC_CACHE_SIZE = 2 ** 16
+
+# Default heuristic weight of Weighted A*
+DEFAULT_WEIGHT = 2
+
+# Default first heuristic weight of ARA*, and how much it is lowered after each solution
+DEFAULT_ARA_INITIAL_WEIGHT = 3
+DEFAULT_ARA_WEIGHT_STEP = 0.5
+
+# Default number of nodes kept in each layer of a beam search, and the number of layers
+#  searched before giving up
+DEFAULT_BEAM_WIDTH = 1000
+DEFAULT_BEAM_MAX_LAYERS = 10 ** 4
+
+# Default number of bytes of generated states the external-memory BFS buffers in memory
+#  before sorting them into a run on disk
+DEFAULT_EXTERNAL_MEMORY_LIMIT = 256 * 2 ** 20
+
+# Bytes a buffered record costs beyond its contents: the bytes object header and the
+#  buffer list's reference to it
+EXTERNAL_RECORD_OVERHEAD = sys.getsizeof(b'') + 8
+
+# Parent index and action code stored after the packed state of each external-memory
+#  BFS record
+EXTERNAL_PARENT = Struct('>IH')
+
+# Seconds between HDA* termination checks while no solution message arrives
+TERMINATION_CHECK_INTERVAL = 0.01
 
 
 class AIDriver:
-    def __init__(self, initial_state, puzzle, heuristic=Heuristic.MANHATTAN_DIST):
+    def __init__(self, initial_state, puzzle, heuristic=Heuristic.MANHATTAN_DIST, fingerprint_closed_set=False, 
+            telemetry=None, heuristic_cache_size=DEFAULT_HEURISTIC_CACHE_SIZE, partial_order_reduction=False, 
+            prune_inverse_moves=False, check_cycles=False):
         """Initializes the AIDriver Class, which encapsulates
         the solving of a given puzzle.
+        
+        If fingerprint_closed_set is True, graph searches keep only 64-bit state 
+        fingerprints in their visited sets (see FingerprintSet) instead of the 
+        states themselves.
+
+        telemetry is the Telemetry instance the searches report their counters to 
+        (A*GS also times its phases), a new one without a snapshot file by default.
+
+        heuristic_cache_size is the number of states whose heuristic is memoized when
+        the heuristic is one of MEMOIZED_HEURISTICS (see get_heuristic), 0 to disable 
+        memoization. The cache is emptied at the start of each search.
+
+        If partial_order_reduction is True, the tree searches (BFTS and ID-DFTS) skip 
+        redundant orderings of independent moves, and if prune_inverse_moves is True 
+        they skip moves undoing the move just made (see get_reduced_actions). If 
+        check_cycles is True they also skip moves back to a state on the current path.
+        None of these need a closed set.
         """
         self.initial_state = initial_state
         self.get_actions = puzzle.get_actions
         self.get_result = puzzle.get_result
         self.check_goal_state = puzzle.check_goal_state
-        self.goal_coord = puzzle.goal_coord
-        self.wall_coords = puzzle.wall_coords
+        self.get_state = puzzle.get_state
+        self.get_wriggler = puzzle.get_wriggler
+        self.num_cells = puzzle.width * puzzle.height
+        self.encode_action = puzzle.encode_action
+        self.decode_action = puzzle.decode_action
+        self.goal_cell = puzzle.goal_cell
+        self.coords = puzzle.coords
+        self.goal_distances = puzzle.goal_distances
         self.heuristic = heuristic
+        self.fingerprint_closed_set = fingerprint_closed_set
+        self.telemetry = telemetry or Telemetry()
+        self.heuristic_cache_size = heuristic_cache_size
+        self.partial_order_reduction = partial_order_reduction
+        self.prune_inverse_moves = prune_inverse_moves
+        self.check_cycles = check_cycles
+
+        # Maps state fingerprints to their heuristic, least recently used first
+        self.heuristic_cache = OrderedDict()
+
+        # Wrigglers whose moves can change the heuristic other than as in get_child_heuristic
+        self.heuristic_wriggler_indices = frozenset([0])
+
+        # Distance from each cell to the goal, for the heuristics that take the smaller 
+        #  distance of wriggler 0's two ends (None for the others)
+        self.end_distances = None
+
+        if self.heuristic == Heuristic.GOAL_DIST:
+            self.end_distances = self.goal_distances
+        
+        elif self.heuristic == Heuristic.MANHATTAN_DIST:
+            goal_coord = self.coords[self.goal_cell]
+            self.end_distances = [abs(coord.x - goal_coord.x) + abs(coord.y - goal_coord.y) for coord in self.coords]
+
+        if self.heuristic == Heuristic.PATTERN_DB:
+            # Build (or load) the pattern database up front so lookups are O(1)
+            self.pattern_database = PatternDatabase(puzzle, initial_state)
+
+            # The abstraction only sees the pattern wrigglers
+            self.heuristic_wriggler_indices = frozenset([wriggler_index 
+                for wriggler_index, _, _ in self.pattern_database.lookup_info])
+
+        elif self.heuristic == Heuristic.NUM_OBSTACLES:
+            # Walls are counted from the puzzle's summed-area table, and wriggler segments
+            #  by masking the occupancy with the rectangle between a cell and the goal
+            self.wall_table = puzzle.wall_table
+            self.goal_rectangle_masks = puzzle.get_goal_rectangle_masks()
     
 
     def bfts(self):
         """Performs a Breadth-First Tree Search (BFTS) on the puzzle's search space starting 
         at the initial state.
         
+        When check_cycles is set, each child's state is looked for along its parent 
+        chain, as the frontier's nodes share no single path.
+        
         Returns a GenericResult class instance containing a solution with final state and a 
         list of actions signifying the path from initial state to goal state if a solution 
         can be found. If a solution cannot be found, a GenericResult class instance indicating 
@@ -35,36 +161,121 @@ class AIDriver:
         """
         print('Performing BFTS\n')
 
+        telemetry = self.telemetry
+        self.start_search('bfts')
+
         frontier = Frontier()
         frontier.insert(SearchNode(self.initial_state))
         
         while True:
             if frontier.is_empty():
                 # Search failure
+                telemetry.end_search()
                 return GenericResult(failure=True)
             
             # Get the next leaf node from the frontier
             leaf_node = frontier.pop()
+            telemetry.begin_expansion(len(frontier), 0)
             
             # Check for the goal state
             if self.check_goal_state(leaf_node.state):
                 # Search success
                 # Return final state and list of actions along path to the goal
                 #  as part of the GenericResult class solution member
+                telemetry.end_search()
                 return GenericResult(solution=Solution(final_state=leaf_node.state, actions=self.get_action_path(leaf_node)))
             
             # Generate all possible actions for the given state
-            actions = self.get_actions(leaf_node.state)
+            actions = self.get_reduced_actions(leaf_node)
+            telemetry.num_generated_nodes += len(actions)
             
             # Create search nodes from the generated actions
             for action in actions:
                 # Generate a new state from the given action
                 new_state = self.get_result(leaf_node.state, action)
+
+                # Skip states already on the path to this node
+                if self.check_cycles and self.check_path_cycle(leaf_node, new_state):
+                    telemetry.num_cyclic_successors += 1
+                    continue
                 
                 # Create a new search node with the created state and add it to the frontier
                 frontier.insert(SearchNode(new_state, leaf_node, action))
     
     
+    def bfgs(self):
+        """Performs a Breadth-First Graph Search (BFGS) on the puzzle's search space starting 
+        at the initial state.
+        
+        Every state is generated at most once: a reached set holds the states that have 
+        been added to the frontier, and children are goal tested as they are generated 
+        so the layer after the goal's is never expanded. With unit step costs the 
+        solution found is optimal.
+        
+        Returns a GenericResult class instance containing a solution with final state and a 
+        list of actions signifying the path from initial state to goal state if a solution 
+        can be found. If a solution cannot be found, a GenericResult class instance indicating 
+        a search failure is returned.
+        """
+        print('Performing BFGS\n')
+
+        telemetry = self.telemetry
+        self.start_search('bfgs')
+
+        initial_node = SearchNode(self.initial_state)
+
+        if self.check_goal_state(self.initial_state):
+            # The initial state is already a goal state
+            telemetry.end_search()
+            return GenericResult(solution=Solution(final_state=self.initial_state, actions=[]))
+
+        frontier = Frontier()
+        frontier.insert(initial_node)
+
+        # States that have been added to the frontier, expanded or not
+        reached_nodes = self.get_visited_nodes()
+        reached_nodes.add(self.get_visited_key(self.initial_state))
+        
+        while True:
+            if frontier.is_empty():
+                # Search failure
+                telemetry.end_search()
+                return GenericResult(failure=True)
+            
+            # Get the next leaf node from the frontier
+            leaf_node = frontier.pop()
+            telemetry.begin_expansion(len(frontier), len(reached_nodes))
+            
+            # Generate all possible actions for the given state
+            actions = self.get_actions(leaf_node.state)
+            telemetry.num_generated_nodes += len(actions)
+            
+            # Create search nodes from the generated actions
+            for action in actions:
+                # Generate a new state from the given action
+                new_state = self.get_result(leaf_node.state, action)
+                new_key = self.get_visited_key(new_state)
+
+                # If this state has already been reached, ignore it
+                if new_key in reached_nodes:
+                    telemetry.num_duplicate_hits += 1
+                    continue
+                
+                new_node = SearchNode(new_state, leaf_node, action)
+
+                # Check for the goal state as soon as it is generated
+                if self.check_goal_state(new_state):
+                    # Search success
+                    # Return final state and list of actions along path to the goal
+                    #  as part of the GenericResult class solution member
+                    telemetry.end_search()
+                    return GenericResult(solution=Solution(final_state=new_state, actions=self.get_action_path(new_node)))
+                
+                # Add the new node to the frontier
+                reached_nodes.add(new_key)
+                frontier.insert(new_node)
+    
+    
     def id_dfts(self):
         """Performs a Iterative Deepening Depth-First Tree Search (ID-DFTS) on the puzzle's search space 
         starting at the initial state.
@@ -72,7 +283,14 @@ class AIDriver:
         Returns a DLSResult class instance containing a solution member with the final state and 
         a list of actions signifying the path from initial state to goal state, if a solution was 
         found. Otherwise, a DLSResult class instance signifying a search failure is returned.
+
+        When check_cycles is set, the states on the current path are kept in a set, 
+        updated as the recursion enters and leaves each node.
         """
+        telemetry = self.telemetry
+
+        # States on the path from the initial state to the node being searched
+        path_states = set([])
         
         def dls(node, limit):
             """Recursively performs a Depth Limited Search (DLS) on the puzzle's search space
@@ -93,19 +311,28 @@ class AIDriver:
                 
             else:
                 cutoff_occurred = False
+                telemetry.begin_expansion(0, len(path_states))
                 
                 # Generate all possible actions for the given state
-                actions = self.get_actions(node.state)
+                actions = self.get_reduced_actions(node)
+                telemetry.num_generated_nodes += len(actions)
             
                 for action in actions:
                     # Apply this action to the current state to get the new state
                     new_state = self.get_result(node.state, action)
+
+                    # Skip states already on the current path
+                    if self.check_cycles and new_state in path_states:
+                        telemetry.num_cyclic_successors += 1
+                        continue
                     
                     # Create a new child search node with the new state and action
                     child_node = SearchNode(new_state, node, action)
                     
                     # Recursively call DLS on the child node with a reduced limit
+                    path_states.add(new_state)
                     result = dls(child_node, limit - 1)
+                    path_states.discard(new_state)
                     
                     if result.cutoff:
                         # A cutoff occurred
@@ -121,28 +348,277 @@ class AIDriver:
                 
                 else:
                     # This search has failed
-                    return DLSReturn(failure=True)
+                    return DLSResult(failure=True)
 
 
         print('Performing ID-DFTS\n')
 
+        self.start_search('id_dfts')
+
         # Iterate through depths from 0 to infinity
         for depth in count(0):
             print('Trying depth', depth)
 
             # Get the DLS result for this depth
+            path_states.add(self.initial_state)
             result = dls(SearchNode(self.initial_state), depth)
+            path_states.clear()
             
             if not result.cutoff:
                 # A solution has been found or a search failure has ocurred
                 # Return the result
+                telemetry.end_search()
                 return result
     
     
-    def grbefgs(self):
+    def external_bfs(self, work_dir=None, memory_limit=DEFAULT_EXTERNAL_MEMORY_LIMIT):
+        """Performs an external-memory Breadth-First Search on the puzzle's search space 
+        starting at the initial state, for state spaces too large for a visited set in 
+        memory.
+        
+        Each layer of states is stored on disk, in a RecordFile under a temporary 
+        directory in work_dir (the system default if None), as records of the packed 
+        body cells of the state followed by the index of its parent in the layer 
+        before and the code of the action leading to it (see Puzzle.encode_action). 
+        Children are buffered in memory until memory_limit bytes are used, then 
+        sorted into a run file. Duplicates are removed in bulk, once a layer is 
+        expanded, by merging its runs against the layer and the one before: every 
+        move can be undone, so no other layer can hold a child's state. Layers are 
+        sorted by state, and the solution path is rebuilt from the parent records.
+        
+        Every file being merged maps a window of at least RecordFile.get_min_window_size 
+        bytes, so when a layer has too many runs for their windows to fit in 
+        memory_limit, they are first merged a group at a time into fewer, longer runs 
+        (see reduce_external_runs). Memory use is therefore bounded by about 
+        memory_limit, as long as it fits the windows of two runs and two layers, while 
+        disk use grows with the number of states reached.
+        
+        Returns an AStarResult instance containing a solution with final state and a 
+        list of actions signifying the path from initial state to goal state if a 
+        solution can be found, along with the number of generated nodes and the max 
+        depth. If a solution cannot be found, an AStarResult class instance indicating 
+        a search failure is returned.
+        """
+        print('Performing external-memory BFS\n')
+
+        telemetry = self.telemetry
+        self.start_search('external_bfs')
+
+        if self.check_goal_state(self.initial_state):
+            # The initial state is already a goal state
+            telemetry.end_search()
+            return AStarResult(solution=Solution(final_state=self.initial_state, actions=[]), 
+                num_expanded_nodes=telemetry.num_generated_nodes)
+        
+        # States are packed as the body cells of every wriggler in order, big-endian so
+        #  records sort by state first
+        wriggler_lengths = [len(wriggler.body_cells) for wriggler in self.initial_state.wriggler_list]
+        state_struct = Struct('>%d%s' % (sum(wriggler_lengths), 'H' if self.num_cells <= 2 ** 16 else 'I'))
+        record_size = state_struct.size + EXTERNAL_PARENT.size
+        pack_state = state_struct.pack
+        pack_parent = EXTERNAL_PARENT.pack
+
+        def unpack_state(record):
+            """Returns the state packed at the start of the given record."""
+            cells = state_struct.unpack_from(record)
+            wrigglers = []
+            start = 0
+
+            for wriggler_length in wriggler_lengths:
+                wrigglers.append(self.get_wriggler(cells[start:start + wriggler_length]))
+                start += wriggler_length
+            
+            return self.get_state(tuple(wrigglers))
+
+
+        # Children buffered before they are written out as a run
+        max_buffered_records = max(1, memory_limit // (record_size + EXTERNAL_RECORD_OVERHEAD))
+
+        with tempfile.TemporaryDirectory(prefix='external_bfs_', dir=work_dir) as layer_dir:
+            layers = [RecordFile(os.path.join(layer_dir, 'layer0'), record_size)]
+            layers[0].write([pack_state(*[cell for wriggler in self.initial_state.wriggler_list 
+                for cell in wriggler.body_cells]) + pack_parent(0, 0)])
+
+            for depth in count(0):
+                layer = layers[depth]
+                print('Expanding depth', depth, 'with', len(layer), 'states')
+
+                runs = []
+                buffer = []
+
+                for parent_index, record in enumerate(layer):
+                    telemetry.begin_expansion(len(layer), 0)
+                    state = unpack_state(record)
+
+                    for action in self.get_actions(state):
+                        new_state = self.get_result(state, action)
+                        action_code = self.encode_action(state, action)
+                        telemetry.num_generated_nodes += 1
+
+                        # Check for the goal state as soon as it is generated
+                        if self.check_goal_state(new_state):
+                            # Search success
+                            # Return final state and list of actions along path to the goal
+                            #  as part of the AStarResult class solution member
+                            telemetry.end_search()
+                            action_codes = self.get_layer_action_codes(layers, depth, parent_index) + [action_code]
+                            action_path = self.get_replayed_action_path(action_codes)
+                            return AStarResult(solution=Solution(final_state=new_state, actions=action_path), 
+                                num_expanded_nodes=telemetry.num_generated_nodes, max_depth=len(action_path) - 1)
+                        
+                        buffer.append(pack_state(*[cell for wriggler in new_state.wriggler_list 
+                            for cell in wriggler.body_cells]) + pack_parent(parent_index, action_code))
+
+                        if len(buffer) >= max_buffered_records:
+                            runs.append(self.write_external_run(buffer, layer_dir, depth, len(runs), record_size))
+                            buffer = []
+                
+                runs.append(self.write_external_run(buffer, layer_dir, depth, len(runs), record_size))
+
+                # Release the buffer before merging
+                buffer = None
+
+                next_layer = RecordFile(os.path.join(layer_dir, 'layer%d' % (depth + 1)), record_size)
+                old_layers = layers[max(0, depth - 1):]
+
+                # Every file merged at once maps a window, so merge few enough runs at a time
+                #  for all the windows, the old layers' included, to fit in memory_limit
+                max_runs = max(2, memory_limit // next_layer.get_min_window_size() - len(old_layers))
+                runs = self.reduce_external_runs(runs, layer_dir, depth, max_runs, memory_limit // max_runs)
+
+                # Merge the runs into the next layer, dropping states of this layer and the one before
+                next_layer.write(self.merge_external_runs(runs, old_layers, state_struct.size, memory_limit))
+
+                for run in runs:
+                    run.delete()
+                
+                if not next_layer:
+                    # Search failure
+                    print('Every reachable state has been searched.')
+                    telemetry.end_search()
+                    return AStarResult(failure=True, num_expanded_nodes=telemetry.num_generated_nodes)
+                
+                layers.append(next_layer)
+
+
+    def write_external_run(self, buffer, layer_dir, depth, run_index, record_size):
+        """Sorts the given buffer of external-memory BFS records and writes it, without
+        records repeating a state, to a new run file, returning its RecordFile.
+        """
+        buffer.sort()
+        
+        run = RecordFile(os.path.join(layer_dir, 'run%d_%d' % (depth, run_index)), record_size)
+        run.write(self.get_unique_records(buffer, record_size - EXTERNAL_PARENT.size))
+
+        return run
+
+
+    def reduce_external_runs(self, runs, layer_dir, depth, max_runs, window_size):
+        """Merges the given list of sorted external-memory BFS runs, max_runs at a time 
+        and mapping window_size bytes of each, into new runs without records repeating 
+        a state, until at most max_runs are left. Returns the list of runs left.
+        
+        Merged runs are deleted, and the new ones are merged again in later groups if 
+        there are still too many, so every record is rewritten about log(len(runs)) / 
+        log(max_runs) times.
+        """
+        runs = list(runs)
+        next_run_index = len(runs)
+
+        while len(runs) > max_runs:
+            group = runs[:max_runs]
+            runs = runs[max_runs:]
+            record_size = group[0].record_size
+
+            merged_run = RecordFile(os.path.join(layer_dir, 'run%d_%d' % (depth, next_run_index)), record_size)
+            merged_run.write(self.get_unique_records(merge(*[run.get_records(window_size) for run in group]), 
+                record_size - EXTERNAL_PARENT.size))
+            next_run_index += 1
+
+            for run in group:
+                run.delete()
+            
+            runs.append(merged_run)
+        
+        return runs
+
+
+    @staticmethod
+    def get_unique_records(records, state_size):
+        """Returns a generator over the given iterable of records sorted by state, 
+        skipping all but the first record of each state.
+        """
+        last_state = None
+
+        for record in records:
+            if record[:state_size] != last_state:
+                last_state = record[:state_size]
+                yield record
+
+
+    def merge_external_runs(self, runs, old_layers, state_size, memory_limit):
+        """Returns a generator over the records of the given sorted runs, in sorted 
+        order, skipping all but the first record of each state and the records of 
+        states found in any of the given sorted old layers.
+        
+        Every file is read in step, mapping a window of its share of memory_limit.
+        """
+        window_size = memory_limit // (len(runs) + len(old_layers))
+
+        # Each old layer is walked alongside the merge, holding its next unmatched state
+        old_iterators = [layer.get_records(window_size) for layer in old_layers]
+        old_states = [next(iterator)[:state_size] for iterator in old_iterators]
+
+        last_state = None
+
+        for record in merge(*[run.get_records(window_size) for run in runs]):
+            state = record[:state_size]
+
+            if state == last_state:
+                continue
+            
+            last_state = state
+            duplicate = False
+
+            for old_index, iterator in enumerate(old_iterators):
+                # Advance this old layer to the first state not below the new one
+                while old_states[old_index] is not None and old_states[old_index] < state:
+                    old_record = next(iterator, None)
+                    old_states[old_index] = old_record[:state_size] if old_record else None
+                
+                if old_states[old_index] == state:
+                    duplicate = True
+            
+            if not duplicate:
+                yield record
+        
+        for iterator in old_iterators:
+            iterator.close()
+
+
+    def get_layer_action_codes(self, layers, depth, index):
+        """Returns a list of the action codes (in chronological order) along the path 
+        from the initial state to the state at the given index of the layer at the 
+        given depth of an external-memory BFS, following the layers' parent records.
+        """
+        action_codes = []
+
+        while depth > 0:
+            index, action_code = EXTERNAL_PARENT.unpack_from(layers[depth].get_record(index), 
+                layers[depth].record_size - EXTERNAL_PARENT.size)
+            action_codes.append(action_code)
+            depth -= 1
+        
+        return action_codes[::-1]
+
+
+    def grbefgs(self, frontier_type=FrontierType.HEAP):
         """Performs a Greedy Best-First Graph Search (GrBeFGS) on the puzzle's 
         search space starting at the initial state.
         
+        Where frontier_type selects the priority queue implementation (see 
+        get_priority_frontier).
+        
         Returns a GenericResult instance containing a solution with final state and a 
         list of actions signifying the path from initial state to goal state if a solution 
         can be found. If a solution cannot be found, a GenericResult class instance indicating 
@@ -150,59 +626,78 @@ class AIDriver:
         """
         print('Performing GrBeFGS\n')
 
-        frontier = PriorityFrontier()
+        telemetry = self.telemetry
+        self.start_search('grbefgs')
+
+        # Nodes with equal heuristics are expanded in the order they were generated
+        frontier = self.get_priority_frontier(frontier_type, lifo=False)
 
         initial_heuristic = self.get_heuristic(self.initial_state)
-        initial_node = SearchNode(self.initial_state)
+        initial_node = SearchNode(self.initial_state, heuristic=initial_heuristic)
+
+        if initial_heuristic == UNREACHABLE:
+            # Search failure
+            telemetry.end_search()
+            return GenericResult(failure=True)
+
         frontier.insert(initial_node, initial_heuristic)
 
-        visited_nodes = set()
+        visited_nodes = self.get_visited_nodes()
         
         while True:
             if frontier.is_empty():
                 # Search failure
+                telemetry.end_search()
                 return GenericResult(failure=True)
             
             # Get the next leaf node from the frontier
             leaf_node = frontier.pop()
+            telemetry.begin_expansion(len(frontier), len(visited_nodes))
             
             # Add this node to the visited nodes set
-            visited_nodes.add(leaf_node)
+            visited_nodes.add(self.get_visited_key(leaf_node.state))
             
             # Check for the goal state
             if self.check_goal_state(leaf_node.state):
                 # Search success
                 # Return final state and list of actions along path to the goal
                 #  as part of the GenericResult class solution member
+                telemetry.end_search()
                 return GenericResult(solution=Solution(final_state=leaf_node.state, actions=self.get_action_path(leaf_node)))
             
             # Generate all possible actions for the given state
             actions = self.get_actions(leaf_node.state)
+            telemetry.num_generated_nodes += len(actions)
             
             # Create search nodes from the generated actions
             for action in actions:
                 # Generate a new state from the given action
                 new_state = self.get_result(leaf_node.state, action)
                 
-                # Get the new state's heuristic
-                new_heuristic = self.get_heuristic(new_state)
+                # Get the new state's heuristic from its parent's
+                new_heuristic = self.get_child_heuristic(leaf_node.state, leaf_node.heuristic, action, new_state)
+
+                # Prune states from which the goal cannot be reached
+                if new_heuristic == UNREACHABLE:
+                    continue
 
                 # Create a new search node with the created state
-                new_node = SearchNode(new_state, leaf_node, action)
+                new_node = SearchNode(new_state, leaf_node, action, heuristic=new_heuristic)
                 
                 # If this node has already been visited, ignore it
-                if new_node in visited_nodes:
+                if self.get_visited_key(new_state) in visited_nodes:
+                    telemetry.num_duplicate_hits += 1
                     continue
 
                 # Check for any nodes with the same state as new_state and with better h values that 
                 #  have yet to be visited in the frontier before adding new_node
                 if new_node in frontier:
                     frontier_node = frontier.peek_node(new_node)
-                    frontier_heuristic = self.get_heuristic(frontier_node.state)
 
-                    if frontier_heuristic <= new_heuristic:
+                    if frontier_node.heuristic <= new_heuristic:
                         # The original heuristic was less than or equal to the new node
                         # Disregard the new node
+                        telemetry.num_duplicate_hits += 1
                         continue
                     
                     else:
@@ -214,10 +709,111 @@ class AIDriver:
                 frontier.insert(new_node, new_heuristic)
 
 
-    def a_star_gs(self):
+    def beam_search(self, beam_width=DEFAULT_BEAM_WIDTH, max_layers=DEFAULT_BEAM_MAX_LAYERS):
+        """Performs a beam search on the puzzle's search space starting at the initial 
+        state.
+        
+        The search proceeds breadth-first one layer at a time, but only the beam_width 
+        children with the lowest heuristics are kept in each layer, ties going to the 
+        first generated. Duplicate states are removed within each layer, and states of 
+        the layer before are not regenerated, using FingerprintSets. Memory use is 
+        therefore bounded by the beam width times the depth reached, with no visited 
+        set growing over the whole search, at the cost of completeness and optimality.
+        The search gives up after max_layers layers.
+        
+        Returns a BeamResult instance containing a solution with final state and a 
+        list of actions signifying the path from initial state to goal state if a solution 
+        can be found, along with the number of nodes pruned for lack of room in the beam. 
+        If a solution cannot be found, a BeamResult class instance indicating a search 
+        failure is returned.
+        """
+        print('Performing beam search with a width of', beam_width, '\n')
+
+        telemetry = self.telemetry
+        self.start_search('beam_search')
+
+        if self.check_goal_state(self.initial_state):
+            # The initial state is already a goal state
+            telemetry.end_search()
+            return BeamResult(solution=Solution(final_state=self.initial_state, actions=[]))
+        
+        layer = [SearchNode(self.initial_state, heuristic=self.get_heuristic(self.initial_state))]
+        previous_layer_keys = FingerprintSet()
+        
+        num_pruned_nodes = 0
+
+        for _ in range(max_layers):
+            layer_keys = FingerprintSet()
+
+            for node in layer:
+                layer_keys.add(node.state.hash_value)
+            
+            # (heuristic, generation order, node) entries of the next layer's candidates
+            candidates = []
+            generation_order = count()
+            candidate_keys = FingerprintSet()
+
+            for leaf_node in layer:
+                telemetry.begin_expansion(len(candidates), len(layer_keys) + len(previous_layer_keys))
+                actions = self.get_actions(leaf_node.state)
+                telemetry.num_generated_nodes += len(actions)
+
+                for action in actions:
+                    new_state = self.get_result(leaf_node.state, action)
+                    key = new_state.hash_value
+
+                    # Ignore states already in this layer, the layer before or the next layer
+                    if key in layer_keys or key in previous_layer_keys or key in candidate_keys:
+                        telemetry.num_duplicate_hits += 1
+                        continue
+                    
+                    candidate_keys.add(key)
+                    new_heuristic = self.get_child_heuristic(leaf_node.state, leaf_node.heuristic, action, new_state)
+                    new_node = SearchNode(new_state, leaf_node, action, heuristic=new_heuristic)
+
+                    # Check for the goal state
+                    if self.check_goal_state(new_state):
+                        # Search success
+                        # Return final state and list of actions along path to the goal
+                        #  as part of the BeamResult class solution member
+                        telemetry.end_search()
+                        return BeamResult(solution=Solution(final_state=new_state, actions=self.get_action_path(new_node)), 
+                            num_pruned_nodes=num_pruned_nodes)
+                    
+                    # Prune states from which the goal cannot be reached
+                    if new_heuristic == UNREACHABLE:
+                        continue
+                    
+                    candidates.append((new_heuristic, next(generation_order), new_node))
+            
+            if not candidates:
+                # Search failure
+                print('Empty beam.')
+                telemetry.end_search()
+                return BeamResult(failure=True, num_pruned_nodes=num_pruned_nodes)
+            
+            # Keep the best candidates
+            num_pruned_nodes += max(0, len(candidates) - beam_width)
+            layer = [node for _, _, node in nsmallest(beam_width, candidates)]
+            previous_layer_keys = layer_keys
+        
+        # Search failure
+        print('Reached the layer limit.')
+        telemetry.end_search()
+        return BeamResult(failure=True, num_pruned_nodes=num_pruned_nodes)
+
+
+    def a_star_gs(self, frontier_type=FrontierType.HEAP, weight=1):
         """Performs a A* Graph Search (A*GS) on the puzzle's search space starting at 
         the initial state.
         
+        Where frontier_type selects the priority queue implementation (see 
+        get_priority_frontier), and nodes are ordered by path cost + weight * heuristic. 
+        A weight above 1 gives Weighted A*, which expands fewer nodes but only 
+        guarantees a solution at most weight times longer than the shortest, as
+        reported in the result's bound. The bucket queue needs integer f-costs, so 
+        it raises ValueError for a weight that is not a whole number.
+        
         Returns an AStarResult instance containing a solution with final state and a 
         list of actions signifying the path from initial state to goal state if a solution 
         can be found. This includes the number of expanded nodes 
@@ -225,131 +821,809 @@ class AIDriver:
         calculating the effective branching factor. If a solution cannot be found, 
         an AStarResult class instance indicating a search failure is returned.
         """
+        if frontier_type == FrontierType.BUCKET:
+            if weight != int(weight):
+                raise ValueError('The bucket frontier needs an integer weight, not %r' % weight)
+            
+            # Whole float weights would still give float f-costs
+            weight = int(weight)
+
         print('Performing A*GS\n')
 
-        frontier = PriorityFrontier()
+        telemetry = self.telemetry
+        self.start_search('a_star_gs')
 
-        initial_node = SearchNode(self.initial_state)
-        initial_heuristic = self.get_heuristic(self.initial_state) + initial_node.path_cost
-        frontier.insert(initial_node, initial_heuristic)
+        frontier = self.get_priority_frontier(frontier_type)
 
-        visited_nodes = set()
-        
-        num_expanded_nodes = 0
+        initial_state_heuristic = self.get_heuristic(self.initial_state)
+
+        if initial_state_heuristic == UNREACHABLE:
+            # Search failure
+            print('The goal cannot be reached from the initial state.')
+            telemetry.end_search()
+            return AStarResult(failure=True, num_expanded_nodes=telemetry.num_generated_nodes)
+
+        # Nodes are stored in an arena, the frontier holds their states
+        arena = NodeArena()
+        initial_index = arena.add(NO_PARENT, 0, 1, initial_state_heuristic)
+        initial_heuristic = weight * initial_state_heuristic + arena.get_path_cost(initial_index)
+
+        frontier.insert(self.initial_state, initial_heuristic)
+
+        # Arena index of the node of each state in the frontier
+        node_indices = {self.initial_state: initial_index}
+
+        visited_nodes = self.get_visited_nodes()
         
         while True:
             if frontier.is_empty():
                 # Search failure
                 print('Empty frontier.')
-                return AStarResult(failure=True)
+                telemetry.end_search()
+                return AStarResult(failure=True, num_expanded_nodes=telemetry.num_generated_nodes)
+            
+            # Count this expansion, timing its phases if it is sampled
+            timed = telemetry.begin_expansion(len(frontier), len(visited_nodes))
+
+            if timed:
+                phase_start_time = perf_counter()
             
             # Get the next leaf node from the frontier
-            leaf_node = frontier.pop()
+            leaf_state = frontier.pop()
             
-            if not leaf_node:
+            if leaf_state is None:
                 # Search failure
                 print('Popped all the frontier nodes.')
-                return AStarResult(failure=True)
+                telemetry.end_search()
+                return AStarResult(failure=True, num_expanded_nodes=telemetry.num_generated_nodes)
+            
+            leaf_index = node_indices.pop(leaf_state)
             
             # Check for the goal state
-            if self.check_goal_state(leaf_node.state):
+            if self.check_goal_state(leaf_state):
                 # Search success
                 # Return final state and list of actions along path to the goal
                 #  as part of the AStarResult class solution member
-                action_path = self.get_action_path(leaf_node)
-                return AStarResult(solution=Solution(final_state=leaf_node.state, actions=action_path), 
-                    num_expanded_nodes=num_expanded_nodes, max_depth=len(action_path) - 1)
+                telemetry.end_search()
+                action_path = self.get_arena_action_path(arena, leaf_index)
+                return AStarResult(solution=Solution(final_state=leaf_state, actions=action_path), 
+                    num_expanded_nodes=telemetry.num_generated_nodes, max_depth=len(action_path) - 1, bound=weight)
+            
+            if timed:
+                phase_start_time = telemetry.add_phase_time(Phase.FRONTIER, phase_start_time)
 
             # Add this node to the visited nodes set
-            visited_nodes.add(leaf_node)
+            visited_nodes.add(self.get_visited_key(leaf_state))
+
+            new_path_cost = arena.get_path_cost(leaf_index) + 1
+            leaf_state_heuristic = arena.get_heuristic(leaf_index)
+            
+            if timed:
+                phase_start_time = telemetry.add_phase_time(Phase.CLOSED_SET, phase_start_time)
             
             # Generate all possible actions for the given state
-            actions = self.get_actions(leaf_node.state)
+            actions = self.get_actions(leaf_state)
+            telemetry.num_generated_nodes += len(actions)
+            
+            if timed:
+                phase_start_time = telemetry.add_phase_time(Phase.MOVE_GENERATION, phase_start_time)
             
             # Create search nodes from the generated actions
             for action in actions:
                 # Generate a new state from the given action
-                new_state = self.get_result(leaf_node.state, action)
-                
-                # Create a new search node with the created state
-                new_node = SearchNode(new_state, leaf_node, action, path_cost=leaf_node.path_cost + 1)
-                
-                num_expanded_nodes += 1
+                new_state = self.get_result(leaf_state, action)
+
+                if timed:
+                    phase_start_time = telemetry.add_phase_time(Phase.STATE_GENERATION, phase_start_time)
 
                 # If this node has already been visited, ignore it
-                if new_node in visited_nodes:
+                if self.get_visited_key(new_state) in visited_nodes:
+                    telemetry.num_duplicate_hits += 1
+
+                    if timed:
+                        phase_start_time = telemetry.add_phase_time(Phase.CLOSED_SET, phase_start_time)
+                    
                     continue
+                
+                if timed:
+                    phase_start_time = telemetry.add_phase_time(Phase.CLOSED_SET, phase_start_time)
+
+                # Get the new node's heuristic, derived from its parent's
+                new_state_heuristic = self.get_child_heuristic(leaf_state, leaf_state_heuristic, action, new_state)
+                new_heuristic = weight * new_state_heuristic + new_path_cost
+
+                if timed:
+                    phase_start_time = telemetry.add_phase_time(Phase.HEURISTIC, phase_start_time)
 
-                # Get the new node's heuristic
-                new_heuristic = self.get_heuristic(new_state) + new_node.path_cost
+                # Prune states from which the goal cannot be reached
+                if new_heuristic == UNREACHABLE:
+                    continue
                 
                 # Check for any nodes with the same state as new_state and with better heuristic values that 
-                #  have yet to be visited in the frontier before adding new_node
-                if new_node in frontier:
-                    frontier_node = frontier.peek_node(new_node)
-                    frontier_heuristic = frontier.peek_heuristic(new_node)
+                #  have yet to be visited in the frontier before adding the new node
+                if new_state in frontier:
+                    frontier_heuristic = frontier.peek_heuristic(new_state)
 
                     if frontier_heuristic <= new_heuristic:
                         # The original heuristic was less than or equal to the new node
                         # Disregard the new node
+                        telemetry.num_duplicate_hits += 1
+
+                        if timed:
+                            phase_start_time = telemetry.add_phase_time(Phase.FRONTIER, phase_start_time)
+                        
                         continue
                     
                     else:
                         # The new node's heuristic is larger
                         # Remove the original node from the frontier
-                        frontier.remove_node(frontier_node)
+                        frontier.remove_node(new_state)
 
-                # Add the new node to the frontier
-                frontier.insert(new_node, new_heuristic)
+                # Add the new node to the arena and its state to the frontier
+                node_indices[new_state] = arena.add(leaf_index, self.encode_action(leaf_state, action), new_path_cost, 
+                    new_state_heuristic)
+                frontier.insert(new_state, new_heuristic)
 
+                if timed:
+                    phase_start_time = telemetry.add_phase_time(Phase.FRONTIER, phase_start_time)
 
-    def get_heuristic(self, state):
-        """Returns the heuristic for the given state."""
 
-        def get_manhattan_distance(coord_a, coord_b):
-            """Returns the manhattan distance between coord_a and coord_b."""
-            return abs(coord_a.x - coord_b.x) + abs(coord_a.y - coord_b.y)
+    def weighted_a_star(self, weight=DEFAULT_WEIGHT, frontier_type=FrontierType.HEAP):
+        """Performs a Weighted A* Graph Search, an A*GS (see a_star_gs) whose heuristic 
+        is multiplied by weight.
+        
+        With a consistent heuristic, the solution found is at most weight times longer 
+        than the shortest one, and the returned AStarResult's bound is set to weight.
+        """
+        print('Using weight', weight)
+
+        return self.a_star_gs(frontier_type, weight)
 
+
+    def ara_star(self, initial_weight=DEFAULT_ARA_INITIAL_WEIGHT, weight_step=DEFAULT_ARA_WEIGHT_STEP, 
+            callback=None):
+        """Performs an Anytime Repairing A* (ARA*) search on the puzzle's search space 
+        starting at the initial state.
         
-        def get_num_obstacles(coord_a, coord_b):
-            """Returns the number of obstacles (wriggler segments or walls) between
-            coord_a and coord_b.
+        A first solution is found quickly with a Weighted A* search using initial_weight, 
+        after which the weight is lowered by weight_step down to 1 and the search is 
+        resumed to improve the solution. Path costs and the frontier are kept between 
+        iterations: each iteration only expands states whose f-cost can beat the best 
+        solution so far, and a state is expanded at most once per iteration, states 
+        improved after their expansion being saved and reopened in the next iteration.
+        
+        After each iteration that improves the solution, callback (if given) is called 
+        with an AStarResult for it, whose bound is the smaller of the weight and the
+        solution cost divided by the smallest unweighted f-cost left to search.
+        
+        Returns an AStarResult instance for the last solution found, with a bound of 1
+        once the search has completed, along with the number of expanded nodes over 
+        all iterations and the max depth. If a solution cannot be found, an AStarResult 
+        class instance indicating a search failure is returned.
+        """
+        print('Performing ARA*\n')
+
+        telemetry = self.telemetry
+        self.start_search('ara_star')
+
+        initial_node = SearchNode(self.initial_state, path_cost=0)
+        initial_heuristic = self.get_heuristic(self.initial_state)
+
+        if initial_heuristic == UNREACHABLE:
+            # Search failure
+            print('The goal cannot be reached from the initial state.')
+            telemetry.end_search()
+            return AStarResult(failure=True, num_expanded_nodes=telemetry.num_generated_nodes)
+        
+        # Best node and heuristic found for each state, keyed by visited key
+        best_nodes = {self.get_visited_key(self.initial_state): initial_node}
+        heuristics = {self.get_visited_key(self.initial_state): initial_heuristic}
+
+        weight = initial_weight
+        frontier = PriorityFrontier()
+        frontier.insert(initial_node, weight * initial_heuristic)
+
+        # Goal node of the best solution so far
+        goal_node = None
+        
+        result = AStarResult(failure=True)
+
+        while True:
+            # Keys of the states expanded during this iteration
+            expanded_keys = set()
+
+            # Nodes improved after their state was expanded during this iteration
+            inconsistent_nodes = {}
+
+            # Expand nodes while their weighted f-cost can beat the incumbent solution
+            while not frontier.is_empty():
+                if goal_node and frontier.peek_min_heuristic() >= goal_node.path_cost:
+                    break
+                
+                telemetry.begin_expansion(len(frontier), len(expanded_keys))
+                leaf_node = frontier.pop()
+                leaf_key = self.get_visited_key(leaf_node.state)
+                expanded_keys.add(leaf_key)
+
+                # Check for the goal state
+                if self.check_goal_state(leaf_node.state):
+                    goal_node = leaf_node
+                    continue
+
+                for action in self.get_actions(leaf_node.state):
+                    new_state = self.get_result(leaf_node.state, action)
+                    new_node = SearchNode(new_state, leaf_node, action, path_cost=leaf_node.path_cost + 1)
+                    key = self.get_visited_key(new_state)
+
+                    telemetry.num_generated_nodes += 1
+
+                    # Ignore states already reached at an equal or smaller path cost
+                    if key in best_nodes and best_nodes[key].path_cost <= new_node.path_cost:
+                        telemetry.num_duplicate_hits += 1
+                        continue
+                    
+                    if key not in heuristics:
+                        heuristics[key] = self.get_child_heuristic(leaf_node.state, heuristics[leaf_key], action, 
+                            new_state)
+                    
+                    # Prune states from which the goal cannot be reached
+                    if heuristics[key] == UNREACHABLE:
+                        continue
+                    
+                    best_nodes[key] = new_node
+
+                    if key in expanded_keys:
+                        # Reopen this state in the next iteration
+                        inconsistent_nodes[key] = new_node
+                        telemetry.num_reopenings += 1
+                    
+                    else:
+                        frontier.insert(new_node, new_node.path_cost + weight * heuristics[key])
+
+            if goal_node is None:
+                # Search failure
+                print('Empty frontier.')
+                telemetry.end_search()
+                return AStarResult(failure=True, num_expanded_nodes=telemetry.num_generated_nodes)
             
-            This function assumes that coord_b is larger (in either/both x and y)
-            than coord_a.
-            """
-            obstacle_count = 0
+            # Move the inconsistent nodes back to the frontier
+            open_nodes = list(frontier) + list(inconsistent_nodes.values())
+
+            # The shortest solution costs at least the smallest unweighted f-cost left to search
+            min_f_cost = min([node.path_cost + heuristics[self.get_visited_key(node.state)] for node in open_nodes], 
+                default=UNREACHABLE)
+            bound = max(1, min(weight, goal_node.path_cost / min_f_cost))
+            
+            if result.failure or goal_node.path_cost < len(result.solution.actions) or bound < result.bound:
+                print('Found a solution of length', goal_node.path_cost, 'within a bound of %.3f' % bound)
+
+                action_path = self.get_action_path(goal_node)
+                result = AStarResult(solution=Solution(final_state=goal_node.state, actions=action_path), 
+                    num_expanded_nodes=telemetry.num_generated_nodes, max_depth=len(action_path) - 1, bound=bound)
+                
+                if callback:
+                    callback(result)
             
-            for x in range(coord_a.x, coord_b.x + 1):
-                for y in range(coord_a.y, coord_b.y + 1):
-                    coord = Coordinate(x, y)
-                    if coord in self.wall_coords or coord in state:
-                        obstacle_count += 1
+            if weight <= 1 or bound <= 1:
+                # The solution is optimal
+                telemetry.end_search()
+                return result
             
-            return obstacle_count
+            # Lower the weight and reorder the frontier by it
+            weight = max(1, weight - weight_step)
+            frontier = PriorityFrontier()
+
+            for node in open_nodes:
+                frontier.insert(node, node.path_cost + weight * heuristics[self.get_visited_key(node.state)])
 
 
-        head_coord = state.wriggler_list[0].get_head()
-        tail_coord = state.wriggler_list[0].get_tail()
+    def ida_star(self, transposition_table_size=DEFAULT_TRANSPOSITION_TABLE_SIZE):
+        """Performs an Iterative Deepening A* (IDA*) search on the puzzle's search space 
+        starting at the initial state.
         
-        head_manhattan_distance = get_manhattan_distance(head_coord, self.goal_coord)
-        tail_manhattan_distance = get_manhattan_distance(tail_coord, self.goal_coord)
+        Each iteration is a depth-first search, driven by an explicit stack, that cuts 
+        off nodes whose f-cost (path cost + heuristic) exceeds the current threshold. 
+        The next threshold is the smallest f-cost that was cut off. A transposition 
+        table remembers, for up to transposition_table_size recently expanded states, 
+        the smallest path cost each was expanded at during this iteration, so repeated 
+        subtrees that cannot do better are skipped. Memory therefore stays bounded by 
+        the table size plus the stack.
+        
+        Returns an AStarResult instance containing a solution with final state and a 
+        list of actions signifying the path from initial state to goal state if a solution 
+        can be found, along with the number of expanded nodes and the max depth. If a 
+        solution cannot be found, an AStarResult class instance indicating a search 
+        failure is returned.
+        """
+        print('Performing IDA*\n')
+
+        telemetry = self.telemetry
+        self.start_search('ida_star')
+
+        threshold = self.get_heuristic(self.initial_state)
+        initial_node = SearchNode(self.initial_state, path_cost=0, heuristic=threshold)
+
+        while threshold != UNREACHABLE:
+            print('Trying threshold', threshold)
+
+            # Smallest f-cost that exceeded the threshold during this iteration
+            next_threshold = UNREACHABLE
+
+            # Maps fingerprints of expanded states to the path cost they were expanded at
+            transposition_table = OrderedDict()
+
+            stack = [initial_node]
+
+            while stack:
+                node = stack.pop()
+                f_cost = node.path_cost + node.heuristic
+
+                if f_cost > threshold:
+                    # Cut off this node, remembering the smallest f-cost beyond the threshold
+                    next_threshold = min(next_threshold, f_cost)
+                    continue
+                
+                # Check for the goal state
+                if self.check_goal_state(node.state):
+                    # Search success
+                    # Return final state and list of actions along path to the goal
+                    #  as part of the AStarResult class solution member
+                    telemetry.end_search()
+                    action_path = self.get_action_path(node)
+                    return AStarResult(solution=Solution(final_state=node.state, actions=action_path), 
+                        num_expanded_nodes=telemetry.num_generated_nodes, max_depth=len(action_path) - 1)
+                
+                # Skip states already expanded this iteration at an equal or smaller path cost,
+                #  their subtree has already been searched with at least this much budget
+                key = node.state.hash_value
+                
+                if key in transposition_table:
+                    if transposition_table[key] <= node.path_cost:
+                        transposition_table.move_to_end(key)
+                        telemetry.num_duplicate_hits += 1
+                        continue
+                    
+                    # The state is expanded again, reached at a smaller path cost
+                    telemetry.num_reopenings += 1
+                
+                elif len(transposition_table) >= transposition_table_size:
+                    # Evict the least recently used state
+                    transposition_table.popitem(last=False)
+                
+                transposition_table[key] = node.path_cost
+                transposition_table.move_to_end(key)
+
+                telemetry.begin_expansion(len(stack), len(transposition_table))
+                
+                # Push the children in reverse so they are searched in action order
+                for action in reversed(self.get_actions(node.state)):
+                    new_state = self.get_result(node.state, action)
+                    new_heuristic = self.get_child_heuristic(node.state, node.heuristic, action, new_state)
+                    stack.append(SearchNode(new_state, node, action, path_cost=node.path_cost + 1, heuristic=new_heuristic))
+                    telemetry.num_generated_nodes += 1
+            
+            threshold = next_threshold
+        
+        # Search failure
+        telemetry.end_search()
+        return AStarResult(failure=True, num_expanded_nodes=telemetry.num_generated_nodes)
+
+
+    def hda_star(self, num_workers=None):
+        """Performs a Hash Distributed A* (HDA*) search on the puzzle's search space 
+        starting at the initial state, using num_workers processes (the number of CPUs 
+        by default).
+        
+        Every state is owned by the worker given by its fingerprint modulo num_workers 
+        (see HDAStarWorker), which keeps the open and closed lists for its states and 
+        receives them from the other workers in batches through multiprocessing queues. 
+        Workers expand their own best nodes asynchronously, reopening states reached at 
+        a smaller path cost, and prune nodes whose f-cost cannot beat the best solution 
+        found so far. The search terminates once every worker is idle and every batch 
+        sent has been received, at which point the best solution found is optimal for 
+        an admissible heuristic.
+        
+        Returns an AStarResult instance containing a solution with final state and a 
+        list of actions signifying the path from initial state to goal state if a solution 
+        can be found, along with the total and per-worker number of expanded nodes and the 
+        max depth. If a solution cannot be found, an AStarResult class instance indicating 
+        a search failure is returned.
+        """
+        if num_workers is None:
+            num_workers = os.cpu_count()
+        
+        print('Performing HDA* with', num_workers, 'workers\n')
+
+        telemetry = self.telemetry
+        self.start_search('hda_star')
+
+        if self.get_heuristic(self.initial_state) == UNREACHABLE:
+            # Search failure
+            print('The goal cannot be reached from the initial state.')
+            telemetry.end_search()
+            return AStarResult(failure=True, num_expanded_nodes=telemetry.num_generated_nodes)
+
+        # State shared between the workers and this coordinating process
+        inboxes = [multiprocessing.Queue() for _ in range(num_workers)]
+        result_queue = multiprocessing.Queue()
+        incumbent = multiprocessing.Value('d', UNREACHABLE)
+        num_sent = multiprocessing.Value('q', 0)
+        num_received = multiprocessing.Value('q', 0)
+        idle_flags = multiprocessing.Array('b', num_workers)
+        stop_event = multiprocessing.Event()
+
+        workers = [multiprocessing.Process(target=HDAStarWorker(worker_index, self, inboxes, result_queue, 
+            incumbent, num_sent, num_received, idle_flags, stop_event).run) for worker_index in range(num_workers)]
+        
+        for worker in workers:
+            worker.start()
+        
+        # Send the initial node to its owner
+        with num_sent.get_lock():
+            num_sent.value += 1
+
+        inboxes[self.initial_state.hash_value % num_workers].put([(self.initial_state, 0, b'')])
+
+        best_path = None
+        best_path_cost = UNREACHABLE
+        worker_num_expanded_nodes = [0] * num_workers
+        num_stats = 0
+
+        def handle_message(message):
+            nonlocal best_path, best_path_cost, num_stats
+
+            if message[0] == 'solution':
+                # Each worker's queue feeder thread delivers its messages independently, 
+                #  so solutions can arrive out of order and only the cheapest is kept
+                if message[1] < best_path_cost:
+                    best_path_cost = message[1]
+                    best_path = message[2]
+            
+            else: # message[0] == 'stats'
+                worker_num_expanded_nodes[message[1]] = message[2]
+                num_stats += 1
+
+        try:
+            while True:
+                try:
+                    handle_message(result_queue.get(timeout=TERMINATION_CHECK_INTERVAL))
+                
+                except Empty:
+                    pass
+
+                if self.check_hda_star_termination(num_sent, num_received, idle_flags):
+                    break
+
+                if any(worker.exitcode is not None for worker in workers):
+                    # Search failure
+                    print('An HDA* worker exited unexpectedly.')
+                    stop_event.set()
+
+                    for worker in workers:
+                        worker.terminate()
+                    
+                    telemetry.end_search()
+                    return AStarResult(failure=True, num_expanded_nodes=telemetry.num_generated_nodes)
+            
+            # Stop the workers and wait for each to report its expansions
+            stop_event.set()
+
+            while num_stats < num_workers:
+                try:
+                    handle_message(result_queue.get(timeout=TERMINATION_CHECK_INTERVAL))
+                
+                except Empty:
+                    # The search is already complete, but a worker that died will never 
+                    #  report, so stop waiting once every worker has exited
+                    if all(worker.exitcode is not None for worker in workers):
+                        print('An HDA* worker exited without reporting its expansions.')
+                        break
+            
+            for worker in workers:
+                worker.join()
+        
+        except BaseException:
+            # Do not leave the workers running if the search is interrupted
+            for worker in workers:
+                worker.terminate()
+            
+            raise
+        
+        # The workers count their own nodes, only the total is recorded here
+        telemetry.num_generated_nodes = sum(worker_num_expanded_nodes)
+        telemetry.end_search()
+
+        if best_path is None:
+            # Search failure
+            print('Every worker ran out of nodes.')
+            return AStarResult(failure=True, num_expanded_nodes=telemetry.num_generated_nodes, 
+                worker_num_expanded_nodes=worker_num_expanded_nodes)
+        
+        # Replay the packed action codes from the initial state to rebuild the solution
+        action_path = []
+        state = self.initial_state
+
+        for (action_code,) in ACTION_CODE.iter_unpack(best_path):
+            action = self.decode_action(state, action_code)
+            action_path.append(action)
+            state = self.get_result(state, action)
+        
+        return AStarResult(solution=Solution(final_state=state, actions=action_path), 
+            num_expanded_nodes=telemetry.num_generated_nodes, max_depth=len(action_path) - 1, 
+            worker_num_expanded_nodes=worker_num_expanded_nodes)
+
+
+    def check_hda_star_termination(self, num_sent, num_received, idle_flags):
+        """Returns True if an HDA* search has terminated, that is every worker is 
+        idle and every batch sent has been received, False otherwise.
+        
+        The counters are read on both sides of the idle flags and must agree and be 
+        unchanged: a worker can only leave the idle state by receiving a batch, and a
+        batch can only be sent by a busy worker, so if no batch was sent or received 
+        while the flags were read, none can be sent again.
+        """
+        total_sent = num_sent.value
+        total_received = num_received.value
+
+        if total_sent != total_received or not all(idle_flags[:]):
+            return False
+        
+        return num_sent.value == total_sent and num_received.value == total_received
+
+
+    def get_reduced_actions(self, node):
+        """Returns a list of the actions applicable to the given node's state, less 
+        those pruned by partial-order reduction and inverse move pruning when they 
+        are enabled.
+        
+        Moves of two different wrigglers commute unless the second enters the cell 
+        the first vacated, so of two such moves made in a row only the ordering with 
+        the lower wriggler index first is kept: after a move of wriggler i, moves of 
+        wrigglers below i are pruned unless they enter the cell it vacated. Any path 
+        can be reordered into one that is never pruned, of the same length and to the 
+        same state, so tree searches stay complete and optimal. Graph searches keep 
+        one parent per state, whose last move would decide the pruning, and IDA*'s 
+        transposition table would have to tell apart expansions under different last 
+        moves, so they do not use it.
+
+        The inverse of a move is the other end of the same wriggler moving into the 
+        cell it vacated, which restores the parent's state, so it never lies on a 
+        shortest path. Pruned actions are counted in the telemetry.
+        """
+        actions = self.get_actions(node.state)
+
+        if node.parent_node is None or not (self.partial_order_reduction or self.prune_inverse_moves):
+            return actions
+        
+        last_wriggler_index, last_wriggler_end, vacated_cell = self.get_last_move(node)
+
+        if self.partial_order_reduction:
+            reduced_actions = [action for action in actions 
+                if action.wriggler_index >= last_wriggler_index or action.move_to_cell == vacated_cell]
+            
+            self.telemetry.num_reduced_successors += len(actions) - len(reduced_actions)
+            actions = reduced_actions
+        
+        if self.prune_inverse_moves:
+            # At most one action is the inverse, so drop it in place
+            for action_index, action in enumerate(actions):
+                if action.wriggler_index == last_wriggler_index and action.move_to_cell == vacated_cell \
+                        and action.wriggler_end != last_wriggler_end:
+                    del actions[action_index]
+                    self.telemetry.num_inverse_successors += 1
+                    break
+        
+        return actions
+
+
+    def get_last_move(self, node):
+        """Returns the (wriggler index, wriggler end, vacated cell) triple of the move 
+        leading to the given non-root node.
+        """
+        action = node.action
+        wriggler = node.parent_node.state.wriggler_list[action.wriggler_index]
+
+        # A head move vacates the tail's cell, a tail move the head's
+        vacated_cell = wriggler.get_tail() if action.wriggler_end == WrigglerEnd.HEAD else wriggler.get_head()
+
+        return action.wriggler_index, action.wriggler_end, vacated_cell
+
+
+    @staticmethod
+    def check_path_cycle(node, state):
+        """Returns True if the given state is the state of the given node or one of 
+        its ancestors.
+        """
+        while node is not None:
+            if node.state == state:
+                return True
+            
+            node = node.parent_node
+        
+        return False
+
+
+    def start_search(self, search_name):
+        """Resets the telemetry for a new search with the given name, and empties the 
+        heuristic cache so that every search computes its own heuristics.
+        """
+        self.telemetry.start_search(search_name)
+        self.heuristic_cache.clear()
+
+
+    def get_heuristic(self, state):
+        """Returns the heuristic for the given state.
+
+        Heuristics in MEMOIZED_HEURISTICS are looked up in a cache of the 
+        heuristic_cache_size most recently used states, keyed by fingerprint, before
+        being computed, and the cache hits and misses are counted in the telemetry.
+        """
+        if self.heuristic not in MEMOIZED_HEURISTICS or self.heuristic_cache_size == 0:
+            return self.compute_heuristic(state)
+        
+        heuristic_cache = self.heuristic_cache
+        key = state.hash_value
+
+        if key in heuristic_cache:
+            heuristic_cache.move_to_end(key)
+            self.telemetry.num_heuristic_cache_hits += 1
+            return heuristic_cache[key]
+        
+        self.telemetry.num_heuristic_cache_misses += 1
+        heuristic = self.compute_heuristic(state)
+
+        if len(heuristic_cache) >= self.heuristic_cache_size:
+            # Evict the least recently used state
+            heuristic_cache.popitem(last=False)
+        
+        heuristic_cache[key] = heuristic
+        return heuristic
+
+
+    def get_child_heuristic(self, state, heuristic, action, new_state):
+        """Returns the heuristic for new_state, the result of applying the given 
+        action to the given state, whose heuristic is heuristic.
+
+        The heuristic is derived from the parent's where possible: moves of wrigglers 
+        the heuristic ignores leave it unchanged, and under NUM_OBSTACLES such moves 
+        only add the cell entered and remove the cell vacated, if they lie between 
+        wriggler 0 and the goal. Under GOAL_DIST and MANHATTAN_DIST, moves of wriggler 0 
+        only update its own term, with two table lookups for its new ends. Other moves 
+        change both of wriggler 0's ends, and so the NUM_OBSTACLES rectangle or the 
+        PATTERN_DB rank as a whole, and fall back to get_heuristic.
+        """
+        if action.wriggler_index in self.heuristic_wriggler_indices:
+            if self.end_distances is not None:
+                # Only wriggler 0 counts, and both of its ends may have moved
+                wriggler = new_state.wriggler_list[0]
+                return min(self.end_distances[wriggler.get_head()], self.end_distances[wriggler.get_tail()])
+            
+            return self.get_heuristic(new_state)
+        
+        if self.heuristic != Heuristic.NUM_OBSTACLES:
+            return heuristic
+        
+        # A head move vacates the tail's cell, a tail move the head's
+        wriggler = state.wriggler_list[action.wriggler_index]
+        vacated_cell = wriggler.get_tail() if action.wriggler_end == WrigglerEnd.HEAD else wriggler.get_head()
+
+        # Wriggler 0 did not move, so neither did the rectangle its obstacles are counted in
+        rectangle_mask = self.goal_rectangle_masks[self.get_obstacle_cell(state)]
+
+        return heuristic + ((rectangle_mask >> action.move_to_cell) & 1) - ((rectangle_mask >> vacated_cell) & 1)
+
+
+    def get_obstacle_cell(self, state):
+        """Returns the end of wriggler 0 whose obstacles NUM_OBSTACLES counts, the one
+        with the smaller Manhattan distance to the goal (the head on ties).
+        """
+        head_cell = state.wriggler_list[0].get_head()
+        tail_cell = state.wriggler_list[0].get_tail()
+        head_coord = self.coords[head_cell]
+        tail_coord = self.coords[tail_cell]
+        goal_coord = self.coords[self.goal_cell]
+
+        # The goal is the bottom-right corner, so no cell lies below or right of it
+        if (goal_coord.x - head_coord.x) + (goal_coord.y - head_coord.y) <= \
+                (goal_coord.x - tail_coord.x) + (goal_coord.y - tail_coord.y):
+            return head_cell
+        
+        return tail_cell
+
+
+    def compute_heuristic(self, state):
+        """Returns the heuristic for the given state, computed from scratch."""
+
+        def get_manhattan_distance(cell_a, cell_b):
+            """Returns the manhattan distance between cell_a and cell_b."""
+            coord_a = self.coords[cell_a]
+            coord_b = self.coords[cell_b]
+            return abs(coord_a.x - coord_b.x) + abs(coord_a.y - coord_b.y)
+
+        
+        def get_num_obstacles(cell):
+            """Returns the number of obstacles (wriggler segments or walls) between
+            the given cell and the goal, in O(1) table lookups and one popcount.
+            """
+            num_walls = self.wall_table.get_count(self.coords[cell], self.coords[self.goal_cell])
+            num_segments = bin(state.occupancy & self.goal_rectangle_masks[cell]).count('1')
+
+            return num_walls + num_segments
+
+
+        if self.heuristic == Heuristic.PATTERN_DB:
+            # Return wriggler 0's exact distance to the goal in the pattern abstraction
+            return self.pattern_database.get_distance(state)
+
+        head_cell = state.wriggler_list[0].get_head()
+        tail_cell = state.wriggler_list[0].get_tail()
+
+        if self.heuristic == Heuristic.GOAL_DIST:
+            # Return the shortest wall-aware distance of wriggler0's tail or head to the goal
+            return min(self.goal_distances[head_cell], self.goal_distances[tail_cell])
         
         # Calculate and return heuristic value depending on which heuristic to use
         if self.heuristic == Heuristic.MANHATTAN_DIST:
             # Return the shortest Manhattan distance of wriggler0's tail or head to the goal
-            return min(head_manhattan_distance, tail_manhattan_distance)
+            return min(get_manhattan_distance(head_cell, self.goal_cell), 
+                get_manhattan_distance(tail_cell, self.goal_cell))
         
         else: # self.heuristic == Heuristic.NUM_OBSTACLES:
             # Return the number of obstacles between wriggler0's tail/head to the goal
             # The tail/head is selected based on which is closer to the goal
-            if head_manhattan_distance <= tail_manhattan_distance:
-                # The head is closer or the same distance away
-                return get_num_obstacles(head_coord, self.goal_coord)
-            
-            else:
-                # The tail is closer
-                return get_num_obstacles(tail_coord, self.goal_coord)
+            return get_num_obstacles(self.get_obstacle_cell(state))
+
+
+    def get_priority_frontier(self, frontier_type, lifo=True):
+        """Returns an empty priority frontier of the given FrontierType.
+        
+        FrontierType.HEAP is a binary heap that accepts any priorities, while 
+        FrontierType.BUCKET is a bucket queue with O(1) operations that requires 
+        non-negative integer priorities, which every Heuristic provides. lifo sets
+        the bucket queue's tie-breaking order, the heap always breaks ties FIFO.
+        """
+        if frontier_type == FrontierType.BUCKET:
+            return BucketFrontier(lifo)
+        
+        return PriorityFrontier()
+
+
+    def get_visited_nodes(self):
+        """Returns an empty visited set for a graph search: a FingerprintSet when
+        fingerprint_closed_set is enabled, a set of states otherwise.
+        """
+        return FingerprintSet() if self.fingerprint_closed_set else set()
+
+
+    def get_visited_key(self, state):
+        """Returns the key under which the given state is stored in a visited set
+        returned by get_visited_nodes.
+        """
+        return state.hash_value if self.fingerprint_closed_set else state
+
+
+    def get_arena_action_path(self, arena, index):
+        """Returns a list of actions (in chronological order) from the initial state
+        to the node at the given index of the given NodeArena, rebuilding each Action
+        by replaying the node's action codes.
+        """
+        return self.get_replayed_action_path(arena.get_action_codes(index))
+
+
+    def get_replayed_action_path(self, action_codes):
+        """Returns a list of the actions encoded by the given action codes (in 
+        chronological order), rebuilding each Action by replaying the codes from the 
+        initial state.
+        """
+        action_path = []
+        state = self.initial_state
+
+        for action_code in action_codes:
+            action = self.decode_action(state, action_code)
+            action_path.append(action)
+            state = self.get_result(state, action)
+        
+        return action_path
 
 
     def get_action_path(self, node):
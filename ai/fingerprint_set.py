@@ -0,0 +1,80 @@
+from array import array
+
+
+# Constants
+# Fraction of the table that may be filled before it doubles in size
+MAX_LOAD_FACTOR = 0.5
+INITIAL_CAPACITY = 1024
+FINGERPRINT_MASK = (1 << 64) - 1
+
+
+class FingerprintSet:
+    def __init__(self):
+        """Initializes the FingerprintSet class, a compact set of 64-bit state 
+        fingerprints (see Zobrist) used in place of a set of states.
+        
+        Fingerprints are stored unboxed in an open addressing table of unsigned 
+        64-bit ints, costing 8 / MAX_LOAD_FACTOR bytes per entry at most. Distinct 
+        states sharing a fingerprint are treated as equal, which with 64-bit 
+        Zobrist hashing is vanishingly rare.
+        """
+        self.table = array('Q', bytes(8 * INITIAL_CAPACITY))
+        self.mask = INITIAL_CAPACITY - 1
+        self.size = 0
+
+
+    def __len__(self):
+        return self.size
+
+
+    def __contains__(self, fingerprint):
+        # 0 marks an empty slot, so a fingerprint of 0 is stored as 1
+        fingerprint = (fingerprint & FINGERPRINT_MASK) or 1
+        table = self.table
+        index = fingerprint & self.mask
+
+        # Linear probing until the fingerprint or an empty slot is found
+        while table[index]:
+            if table[index] == fingerprint:
+                return True
+
+            index = (index + 1) & self.mask
+        
+        return False
+
+
+    def add(self, fingerprint):
+        """Adds the given fingerprint to the set."""
+        fingerprint = (fingerprint & FINGERPRINT_MASK) or 1
+        table = self.table
+        index = fingerprint & self.mask
+
+        while table[index]:
+            if table[index] == fingerprint:
+                # Already present
+                return
+
+            index = (index + 1) & self.mask
+        
+        table[index] = fingerprint
+        self.size += 1
+
+        if self.size > MAX_LOAD_FACTOR * len(table):
+            self.grow()
+
+
+    def grow(self):
+        """Doubles the capacity of the table, reinserting every fingerprint."""
+        old_table = self.table
+        self.table = array('Q', bytes(16 * len(old_table)))
+        self.mask = len(self.table) - 1
+        table = self.table
+
+        for fingerprint in old_table:
+            if fingerprint:
+                index = fingerprint & self.mask
+
+                while table[index]:
+                    index = (index + 1) & self.mask
+                
+                table[index] = fingerprint
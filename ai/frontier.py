@@ -1,7 +1,15 @@
+from collections import deque
+
+
 class Frontier:
     def __init__(self):
         """Initializes the Frontier (FIFO queue) class."""
-        self.nodes = []
+        # A deque gives O(1) appends and pops at either end
+        self.nodes = deque()
+
+
+    def __len__(self):
+        return len(self.nodes)
 
     
     def is_empty(self):
@@ -13,7 +21,7 @@ class Frontier:
         """Removes & returns the element at the 0th position
         of the frontier.
         """
-        return self.nodes.pop(0)
+        return self.nodes.popleft()
     
     
     def insert(self, node):
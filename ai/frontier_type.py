@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+# Priority queue implementations available to best-first searches
+class FrontierType(Enum):
+    HEAP   = 0
+    BUCKET = 1
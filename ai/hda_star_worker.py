@@ -0,0 +1,190 @@
+from heapq import heappop, heappush
+from itertools import count
+from queue import Empty
+from struct import Struct
+
+
+# Constants
+# Heuristic value of states from which the goal cannot be reached
+UNREACHABLE = float('inf')
+
+# Nodes expanded between checks of the inbox and the incumbent solution cost
+EXPANSIONS_PER_ROUND = 64
+
+# Nodes buffered for another worker before they are sent as one batch
+BATCH_SIZE = 256
+
+# Seconds an idle worker waits for a batch before checking for termination again
+IDLE_WAIT = 0.01
+
+# Action codes (see Puzzle.encode_action) are stored as unsigned 16-bit integers, enough
+#  for 8192 wrigglers
+ACTION_CODE = Struct('<H')
+
+
+class HDAStarWorker:
+    def __init__(self, worker_index, driver, inboxes, result_queue, incumbent, num_sent, num_received,
+            idle_flags, stop_event):
+        """Initializes the HDAStarWorker class, one of the processes of a Hash
+        Distributed A* (HDA*) search run by AIDriver.hda_star.
+
+        The worker owns every state whose fingerprint modulo the number of workers is
+        its worker_index, and keeps the open and closed lists for those states only.
+        Generated states owned by another worker are sent to that worker's inbox in
+        batches. Nodes travel as (state, path cost, path) tuples, where the path is
+        a bytes string of packed action codes from the initial state.
+
+        The remaining arguments are shared with the coordinating process: incumbent
+        holds the cost of the best solution found so far, num_sent and num_received
+        count batches put on and taken off the inboxes, idle_flags marks the workers
+        with nothing left to expand, and stop_event is set once the search terminates.
+        """
+        self.worker_index = worker_index
+        self.driver = driver
+        self.inboxes = inboxes
+        self.result_queue = result_queue
+        self.incumbent = incumbent
+        self.num_sent = num_sent
+        self.num_received = num_received
+        self.idle_flags = idle_flags
+        self.stop_event = stop_event
+
+
+    def run(self):
+        """Runs the worker until the stop event is set.
+
+        Solutions are reported as ('solution', path cost, path) messages on the
+        result queue when goal nodes are expanded, and a final ('stats', worker_index,
+        num_expanded_nodes) message is put on it before returning.
+        """
+        driver = self.driver
+        get_actions = driver.get_actions
+        get_result = driver.get_result
+        get_heuristic = driver.get_heuristic
+        get_visited_key = driver.get_visited_key
+        encode_action = driver.encode_action
+        pack_action_code = ACTION_CODE.pack
+
+        num_workers = len(self.inboxes)
+        inbox = self.inboxes[self.worker_index]
+
+        # Heap of (f-cost, -path cost, insertion order, state, path) entries
+        # Larger path costs break f-cost ties, insertion order breaks the rest
+        open_list = []
+
+        # Best path cost each owned state has been reached with, open or closed
+        path_costs = {}
+
+        # Nodes waiting to be sent to each worker
+        outboxes = [[] for _ in range(num_workers)]
+
+        insertion_order = count()
+        num_expanded_nodes = 0
+        incumbent = self.incumbent.value
+
+        def receive_node(state, path_cost, path):
+            # Ignore states already reached at an equal or smaller path cost
+            key = get_visited_key(state)
+
+            if path_costs.get(key, UNREACHABLE) <= path_cost:
+                return
+
+            f_cost = path_cost + get_heuristic(state)
+
+            # Prune states from which no solution shorter than the incumbent can be found
+            if f_cost >= incumbent:
+                return
+
+            # States reached at a smaller path cost are (re)opened, even if already expanded
+            path_costs[key] = path_cost
+            heappush(open_list, (f_cost, -path_cost, next(insertion_order), state, path))
+
+        while not self.stop_event.is_set():
+            incumbent = self.incumbent.value
+
+            # Nodes are popped in f-cost order, so once the best open node cannot beat the
+            #  incumbent no other open node can
+            if open_list and open_list[0][0] >= incumbent:
+                open_list.clear()
+
+            for _ in range(EXPANSIONS_PER_ROUND):
+                if not open_list:
+                    break
+
+                _, negative_path_cost, _, state, path = heappop(open_list)
+                path_cost = -negative_path_cost
+
+                # Skip entries superseded by a smaller path cost to the same state
+                if path_costs[get_visited_key(state)] != path_cost:
+                    continue
+
+                # Check for the goal state
+                if driver.check_goal_state(state):
+                    with self.incumbent.get_lock():
+                        if path_cost < self.incumbent.value:
+                            self.incumbent.value = path_cost
+                            self.result_queue.put(('solution', path_cost, path))
+
+                    incumbent = min(incumbent, path_cost)
+                    continue
+
+                for action in get_actions(state):
+                    new_state = get_result(state, action)
+                    new_path = path + pack_action_code(encode_action(state, action))
+
+                    num_expanded_nodes += 1
+
+                    owner = new_state.hash_value % num_workers
+
+                    if owner == self.worker_index:
+                        receive_node(new_state, path_cost + 1, new_path)
+                        continue
+
+                    outboxes[owner].append((new_state, path_cost + 1, new_path))
+
+                    if len(outboxes[owner]) >= BATCH_SIZE:
+                        self.send_batch(outboxes, owner)
+
+            # Flush every partial batch so no node is held back while this worker waits
+            for owner in range(num_workers):
+                if outboxes[owner]:
+                    self.send_batch(outboxes, owner)
+
+            if not open_list:
+                # Nothing is left to expand, so this worker is idle until a batch arrives
+                self.idle_flags[self.worker_index] = 1
+
+            # Take in every batch waiting in the inbox, blocking briefly for the first if idle
+            while True:
+                try:
+                    if open_list:
+                        batch = inbox.get_nowait()
+                    else:
+                        batch = inbox.get(timeout=IDLE_WAIT)
+
+                except Empty:
+                    break
+
+                # Mark this worker busy before counting the batch as received, so the
+                #  coordinator never sees it idle with the batch unaccounted for
+                self.idle_flags[self.worker_index] = 0
+
+                with self.num_received.get_lock():
+                    self.num_received.value += 1
+
+                for state, path_cost, path in batch:
+                    receive_node(state, path_cost, path)
+
+        self.result_queue.put(('stats', self.worker_index, num_expanded_nodes))
+
+
+    def send_batch(self, outboxes, owner):
+        """Sends the nodes buffered for the given owner to its inbox and empties
+        the buffer.
+        """
+        # The batch is counted before it is put, so it is never in flight uncounted
+        with self.num_sent.get_lock():
+            self.num_sent.value += 1
+
+        self.inboxes[owner].put(outboxes[owner])
+        outboxes[owner] = []
@@ -4,3 +4,5 @@ from enum import Enum
 class Heuristic(Enum):
     MANHATTAN_DIST = 0
     NUM_OBSTACLES  = 1
+    PATTERN_DB     = 2
+    GOAL_DIST      = 3
@@ -0,0 +1,64 @@
+from array import array
+
+
+# Constants
+# Parent index of the root node
+NO_PARENT = -1
+
+
+class NodeArena:
+    def __init__(self):
+        """Initializes the NodeArena class, compact storage for the search nodes of
+        a graph search.
+        
+        Nodes are rows of four parallel arrays, addressed by their integer index: 
+        the index of the parent node, the action code of the action leading to the 
+        node (see Puzzle.encode_action), its path cost and the (finite) heuristic of 
+        its state. A node therefore takes 14 bytes instead of a SearchNode and an 
+        Action object, and the arena holds no references for the garbage collector
+        to trace. States are not stored: a node's path is rebuilt by replaying its
+        action codes from the initial state.
+        """
+        self.parent_indices = array('i')
+        self.action_codes = array('H')
+        self.path_costs = array('I')
+        self.heuristics = array('I')
+
+
+    def __len__(self):
+        return len(self.path_costs)
+
+
+    def add(self, parent_index, action_code, path_cost, heuristic):
+        """Adds a node with the given parent index, action code, path cost and 
+        heuristic to the arena, returning its index.
+        """
+        self.parent_indices.append(parent_index)
+        self.action_codes.append(action_code)
+        self.path_costs.append(path_cost)
+        self.heuristics.append(heuristic)
+
+        return len(self.path_costs) - 1
+
+
+    def get_path_cost(self, index):
+        """Returns the path cost of the node at the given index."""
+        return self.path_costs[index]
+
+
+    def get_heuristic(self, index):
+        """Returns the heuristic of the state of the node at the given index."""
+        return self.heuristics[index]
+
+
+    def get_action_codes(self, index):
+        """Returns a list of the action codes (in chronological order) along the 
+        path from the root to the node at the given index.
+        """
+        action_codes = []
+
+        while self.parent_indices[index] != NO_PARENT:
+            action_codes.append(self.action_codes[index])
+            index = self.parent_indices[index]
+        
+        return action_codes[::-1]
@@ -0,0 +1,250 @@
+import hashlib
+import numpy
+import os
+
+
+# Constants
+# Largest number of entries (ranked abstract states) a pattern database table may hold
+DEFAULT_MAX_ENTRIES = 2 ** 22
+
+# Directory that pattern database tables are saved to and reused from
+DEFAULT_CACHE_DIR = 'pattern_db_cache'
+
+# Table value of abstract states from which the goal cannot be reached
+UNREACHABLE = 255
+
+# Largest distance that can be stored, larger distances are clamped (which keeps 
+#  the heuristic admissible)
+MAX_DISTANCE = UNREACHABLE - 1
+
+
+class PatternDatabase:
+    def __init__(self, puzzle, initial_state, max_entries=DEFAULT_MAX_ENTRIES, cache_dir=DEFAULT_CACHE_DIR):
+        """Initializes the PatternDatabase class, which stores the exact number of 
+        moves needed to bring wriggler 0 to the goal in an abstraction of the puzzle 
+        that keeps wriggler 0 plus a subset (the pattern) of the other wrigglers.
+        
+        Abstract states are ranked with a mixed radix over each pattern wriggler's
+        placement index, so the table is a dense NumPy uint8 array and a lookup is 
+        a few dict lookups and one array access. The table is filled by a 
+        breadth-first search backwards from every abstract goal state, which is 
+        exact because every move can be undone by moving the other end back.
+        
+        The table only depends on the wall layout and the pattern wrigglers' 
+        lengths, so it is saved under cache_dir and reused by later runs.
+        """
+        self.puzzle = puzzle
+        
+        # All placements of a wriggler body, keyed by body length
+        self.placements = {}
+
+        wriggler_list = initial_state.wriggler_list
+        self.pattern = self.choose_pattern(wriggler_list, max_entries)
+        lengths = [len(wriggler_list[wriggler_index].body_cells) for wriggler_index in self.pattern]
+
+        # Mixed radix strides of each pattern wriggler's placement index
+        self.strides = []
+        num_entries = 1
+
+        for length in lengths:
+            self.strides.append(num_entries)
+            num_entries *= len(self.get_placements(length)[0])
+        
+        # (wriggler index, placement index dict, stride) for each pattern wriggler
+        self.lookup_info = [(wriggler_index, self.get_placements(length)[1], stride) 
+            for wriggler_index, length, stride in zip(self.pattern, lengths, self.strides)]
+
+        # Load the table if it was built on an earlier run, build and save it otherwise
+        table_path = os.path.join(cache_dir, self.get_table_key(lengths) + '.npy')
+
+        if os.path.isfile(table_path):
+            self.table = numpy.load(table_path)
+        
+        else:
+            self.table = self.build_table(lengths, num_entries)
+            os.makedirs(cache_dir, exist_ok=True)
+
+            # Write to a temporary file first so concurrent runs never read a partial table
+            temp_path = table_path + '.' + str(os.getpid()) + '.tmp'
+            with open(temp_path, 'wb') as f:
+                numpy.save(f, self.table)
+            
+            os.replace(temp_path, table_path)
+
+
+    def get_distance(self, state):
+        """Returns the number of moves wriggler 0 needs to reach the goal in the
+        abstraction of the given state, or infinity if it cannot be reached.
+        """
+        rank = 0
+        wriggler_list = state.wriggler_list
+
+        for wriggler_index, placement_indices, stride in self.lookup_info:
+            rank += placement_indices[wriggler_list[wriggler_index].body_cells] * stride
+        
+        distance = self.table[rank]
+
+        return float('inf') if distance == UNREACHABLE else int(distance)
+
+
+    def choose_pattern(self, wriggler_list, max_entries):
+        """Returns a list of the indices of the pattern wrigglers, starting with 0.
+        
+        Other wrigglers are considered in order of how close they are to the route 
+        between wriggler 0 and the goal, and added while the table still fits 
+        within max_entries.
+        """
+        coords = self.puzzle.coords
+        goal_coord = coords[self.puzzle.goal_cell]
+        end_coords = [coords[wriggler_list[0].get_head()], coords[wriggler_list[0].get_tail()]]
+
+        def get_detour(cell):
+            """Returns the length of the shortest walk from one of wriggler 0's ends 
+            to the goal that passes through the given cell, ignoring walls.
+            """
+            coord = coords[cell]
+            goal_distance = abs(coord.x - goal_coord.x) + abs(coord.y - goal_coord.y)
+            return goal_distance + min([abs(coord.x - end_coord.x) + abs(coord.y - end_coord.y) 
+                for end_coord in end_coords])
+
+        candidates = sorted(range(1, len(wriggler_list)), 
+            key=lambda wriggler_index: min([get_detour(cell) for cell in wriggler_list[wriggler_index].body_cells]))
+        
+        pattern = [0]
+        num_entries = len(self.get_placements(len(wriggler_list[0].body_cells))[0])
+
+        for wriggler_index in candidates:
+            num_placements = len(self.get_placements(len(wriggler_list[wriggler_index].body_cells))[0])
+
+            if num_entries * num_placements <= max_entries:
+                pattern.append(wriggler_index)
+                num_entries *= num_placements
+        
+        return pattern
+
+
+    def get_placements(self, length):
+        """Returns a (placement list, placement index dict) tuple for wriggler bodies 
+        of the given length, where each placement is a tuple of cells ordered from 
+        head to tail that fits on the board's non-wall cells.
+        """
+        if length in self.placements:
+            return self.placements[length]
+        
+        neighbour_cells = self.puzzle.neighbour_cells
+        placements = []
+
+        def extend(body_cells):
+            """Appends every placement that starts with the given body cells."""
+            if len(body_cells) == length:
+                placements.append(tuple(body_cells))
+                return
+            
+            for adj_cell in neighbour_cells[body_cells[-1]]:
+                if adj_cell not in body_cells:
+                    body_cells.append(adj_cell)
+                    extend(body_cells)
+                    body_cells.pop()
+
+        for cell in range(self.puzzle.width * self.puzzle.height):
+            if cell not in self.puzzle.wall_cells:
+                extend([cell])
+        
+        placement_indices = {body_cells: index for index, body_cells in enumerate(placements)}
+        self.placements[length] = (placements, placement_indices)
+
+        return self.placements[length]
+
+
+    def get_table_key(self, lengths):
+        """Returns a key identifying the table for this wall layout and these 
+        pattern wriggler lengths.
+        """
+        layout = (self.puzzle.width, self.puzzle.height, sorted(self.puzzle.wall_cells), lengths)
+        return hashlib.sha1(repr(layout).encode()).hexdigest()
+
+
+    def get_transitions(self, length):
+        """Returns (target index, entered cell) NumPy arrays describing, for each 
+        placement of the given length, the placements reachable in one move and the 
+        cell that has to be empty for that move. Rows are padded with -1.
+        """
+        placements, placement_indices = self.get_placements(length)
+        neighbour_cells = self.puzzle.neighbour_cells
+        targets = numpy.full((len(placements), 6), -1, dtype=numpy.int64)
+        entered_cells = numpy.full((len(placements), 6), -1, dtype=numpy.int64)
+
+        for index, body_cells in enumerate(placements):
+            column = 0
+
+            # Head moves
+            for adj_cell in neighbour_cells[body_cells[0]]:
+                if adj_cell not in body_cells:
+                    targets[index, column] = placement_indices[(adj_cell,) + body_cells[:-1]]
+                    entered_cells[index, column] = adj_cell
+                    column += 1
+            
+            # Tail moves
+            for adj_cell in neighbour_cells[body_cells[-1]]:
+                if adj_cell not in body_cells:
+                    targets[index, column] = placement_indices[body_cells[1:] + (adj_cell,)]
+                    entered_cells[index, column] = adj_cell
+                    column += 1
+        
+        return targets, entered_cells
+
+
+    def build_table(self, lengths, num_entries):
+        """Returns the distance table, computed with a vectorized breadth-first 
+        search backwards from every abstract goal state.
+        """
+        goal_cell = self.puzzle.goal_cell
+        bodies = [numpy.array(self.get_placements(length)[0], dtype=numpy.int64) for length in lengths]
+        transitions = [self.get_transitions(length) for length in lengths]
+        num_placements = [len(body_array) for body_array in bodies]
+
+        # Seed the search with every non-overlapping abstract state in which one of 
+        #  wriggler 0's ends is on the goal
+        ranks = numpy.flatnonzero((bodies[0][:, 0] == goal_cell) | (bodies[0][:, -1] == goal_cell))
+        cells = bodies[0][ranks]
+
+        for position in range(1, len(lengths)):
+            # Pair every partial state with every placement of the next wriggler
+            other_indices = numpy.tile(numpy.arange(num_placements[position]), len(ranks))
+            ranks = numpy.repeat(ranks, num_placements[position])
+            cells = numpy.repeat(cells, num_placements[position], axis=0)
+            other_cells = bodies[position][other_indices]
+            
+            keep = ~(cells[:, :, None] == other_cells[:, None, :]).any(axis=(1, 2))
+            ranks = ranks[keep] + other_indices[keep] * self.strides[position]
+            cells = numpy.concatenate([cells[keep], other_cells[keep]], axis=1)
+        
+        table = numpy.full(num_entries, UNREACHABLE, dtype=numpy.uint8)
+        table[ranks] = 0
+        frontier = ranks
+        distance = 0
+
+        while frontier.size:
+            distance += 1
+            indices = [(frontier // stride) % count for stride, count in zip(self.strides, num_placements)]
+            body_cells = [bodies[position][indices[position]] for position in range(len(lengths))]
+            children = []
+
+            for position, (targets, entered_cells) in enumerate(transitions):
+                for column in range(targets.shape[1]):
+                    target = targets[indices[position], column]
+                    entered_cell = entered_cells[indices[position], column]
+                    valid = target >= 0
+
+                    # The entered cell must not hold another pattern wriggler
+                    for other_position in range(len(lengths)):
+                        if other_position != position:
+                            valid &= ~(body_cells[other_position] == entered_cell[:, None]).any(axis=1)
+                    
+                    children.append(frontier[valid] + (target[valid] - indices[position][valid]) * self.strides[position])
+            
+            children = numpy.unique(numpy.concatenate(children))
+            frontier = children[table[children] == UNREACHABLE]
+            table[frontier] = min(distance, MAX_DISTANCE)
+        
+        return table
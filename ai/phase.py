@@ -0,0 +1,15 @@
+from enum import Enum
+
+
+# Parts of a node expansion timed by Telemetry
+#  MOVE_GENERATION:  Listing the actions applicable to a state
+#  STATE_GENERATION: Applying an action, including the incremental fingerprint update
+#  CLOSED_SET:       Looking states up in the visited set or transposition table
+#  HEURISTIC:        Computing heuristics
+#  FRONTIER:         Frontier (or stack) pushes, pops and lookups
+class Phase(Enum):
+    MOVE_GENERATION  = 0
+    STATE_GENERATION = 1
+    CLOSED_SET       = 2
+    HEURISTIC        = 3
+    FRONTIER         = 4
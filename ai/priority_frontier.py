@@ -6,23 +6,29 @@ class PriorityFrontier():
     def __init__(self):
         """Initializes the PriorityFrontier (priority queue) class."""
         # A heap queue of [heuristic, count, node] lists
+        # Entries of removed nodes stay in the heap with their node set to None
+        #  and are discarded when they reach the top
         self.queue = []
         
         # Counter used for assigning a count to each node
         self.counter = itertools.count()
 
-        # Nodes that are currently in the queue
-        # Both the key & value are the node for fast lookup & retrival
+        # Entries of the nodes that are currently in the queue, keyed by node
         self.node_dict = {}
 
-        # Nodes that have been removed from the queue
-        self.removed_nodes = set()
-
 
     def __contains__(self, node):
         return node in self.node_dict
 
 
+    def __len__(self):
+        return len(self.node_dict)
+
+
+    def __iter__(self):
+        return iter(self.node_dict)
+
+
     def peek_node(self, node):
         """Returns the node equal to the given node from the nodes list.
         
@@ -39,13 +45,27 @@ class PriorityFrontier():
         return self.node_dict[node][0]
         
 
+    def peek_min_heuristic(self):
+        """Returns the lowest heuristic value in the frontier without removing its
+        node, or None if the frontier is empty.
+        """
+        # Discard entries of removed nodes until a live one is on top
+        while self.queue and self.queue[0][-1] is None:
+            heappop(self.queue)
+        
+        return self.queue[0][0] if self.queue else None
+        
+
     def is_empty(self):
         """Returns True if the frontier is empty, False otherwise."""
-        return len(self.queue) == 0
+        return len(self.node_dict) == 0
     
 
     def insert(self, node, heuristic):
-        """Adds the given node to the frontier."""
+        """Adds the given node to the frontier, replacing any equal node."""
+        if node in self.node_dict:
+            self.remove_node(node)
+
         count = next(self.counter)
         entry = [heuristic, count, node]
         self.node_dict[node] = entry
@@ -55,7 +75,7 @@ class PriorityFrontier():
     def remove_node(self, node):
         """Removes the node equal to the given node from the queue."""
         entry = self.node_dict.pop(node)
-        self.removed_nodes.add(entry[-1])
+        entry[-1] = None
 
 
     def pop(self):
@@ -65,7 +85,9 @@ class PriorityFrontier():
         while self.queue:
             heuristic, count, node = heappop(self.queue)
 
-            if node is not self.removed_nodes:
+            if node is not None:
+                # Skip entries of removed nodes
+                del self.node_dict[node]
                 return node
         
         return None
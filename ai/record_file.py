@@ -0,0 +1,90 @@
+import mmap
+import os
+
+
+# Constants
+# Default number of bytes of a record file mapped into memory at once while it is read
+DEFAULT_WINDOW_SIZE = 2 ** 20
+
+
+class RecordFile:
+    def __init__(self, path, record_size):
+        """Initializes the RecordFile class, a file on disk holding a sequence of
+        fixed-size binary records, used by the external-memory searches.
+
+        Records are written once, in order, with write. They are then read back by
+        memory-mapping the file one window at a time, so only the window being read
+        is held in memory, however large the file.
+        """
+        self.path = path
+        self.record_size = record_size
+        self.num_records = 0
+
+
+    def __len__(self):
+        return self.num_records
+
+
+    def write(self, records):
+        """Writes the given iterable of records (bytes of record_size bytes each) to
+        the file, replacing its contents, and returns the number written.
+        """
+        self.num_records = 0
+
+        with open(self.path, 'wb') as record_file:
+            for record in records:
+                record_file.write(record)
+                self.num_records += 1
+
+        return self.num_records
+
+
+    def get_min_window_size(self):
+        """Returns the smallest number of bytes get_records maps at a time, whatever
+        window size it is asked for.
+        """
+        # Windows start on multiples of the allocation granularity and end on record
+        #  boundaries, so their size must be a multiple of both
+        return self.record_size * mmap.ALLOCATIONGRANULARITY
+
+
+    def get_records(self, window_size=DEFAULT_WINDOW_SIZE):
+        """Returns a generator over the records in the file, in order, mapping about
+        window_size bytes of it at a time, rounded down to a multiple of (and at 
+        least) get_min_window_size.
+        """
+        record_size = self.record_size
+        window_unit = self.get_min_window_size()
+        window_size = max(1, window_size // window_unit) * window_unit
+        file_size = self.num_records * record_size
+
+        with open(self.path, 'rb') as record_file:
+            for offset in range(0, file_size, window_size):
+                length = min(window_size, file_size - offset)
+
+                with mmap.mmap(record_file.fileno(), length, access=mmap.ACCESS_READ, offset=offset) as window:
+                    for record_offset in range(0, length, record_size):
+                        yield window[record_offset:record_offset + record_size]
+
+
+    def __iter__(self):
+        return self.get_records()
+
+
+    def get_record(self, index):
+        """Returns the record at the given index, mapping only the part of the file
+        holding it.
+        """
+        record_offset = index * self.record_size
+        offset = record_offset - record_offset % mmap.ALLOCATIONGRANULARITY
+
+        with open(self.path, 'rb') as record_file:
+            with mmap.mmap(record_file.fileno(), record_offset - offset + self.record_size,
+                    access=mmap.ACCESS_READ, offset=offset) as window:
+                return window[record_offset - offset:record_offset - offset + self.record_size]
+
+
+    def delete(self):
+        """Deletes the file from disk."""
+        os.remove(self.path)
+        self.num_records = 0
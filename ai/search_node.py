@@ -1,10 +1,18 @@
 class SearchNode:
-    def __init__(self, state, parent_node=None, action=None, path_cost=1):
-        """Initializes the SearchNode class."""
+    __slots__ = ('state', 'parent_node', 'action', 'path_cost', 'heuristic')
+
+
+    def __init__(self, state, parent_node=None, action=None, path_cost=1, heuristic=None):
+        """Initializes the SearchNode class.
+        
+        heuristic caches the heuristic of the node's state for the informed searches,
+        so it is computed once per node.
+        """
         self.state = state
         self.parent_node = parent_node
         self.action = action
         self.path_cost = path_cost
+        self.heuristic = heuristic
 
 
     def __hash__(self):
@@ -12,4 +20,4 @@ class SearchNode:
 
 
     def __eq__(self, other):
-        return hash(self) == hash(other)
+        return self.state == other.state
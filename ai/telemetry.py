@@ -0,0 +1,151 @@
+from ai.phase import Phase
+import json
+import time
+
+
+# Constants
+# Seconds between snapshots written to the snapshot file
+DEFAULT_SNAPSHOT_INTERVAL = 1.0
+
+# Only one expansion in this many has its phases timed, which keeps the clock calls off
+#  most expansions
+DEFAULT_TIMING_SAMPLE_INTERVAL = 64
+
+# Expansions between checks of the clock for a due snapshot
+SNAPSHOT_CHECK_INTERVAL = 1024
+
+
+class Telemetry:
+    def __init__(self, snapshot_path=None, snapshot_interval=DEFAULT_SNAPSHOT_INTERVAL, 
+            timing_sample_interval=DEFAULT_TIMING_SAMPLE_INTERVAL, label=None):
+        """Initializes the Telemetry class, which collects the counters and phase 
+        timings of the searches run by an AIDriver.
+        
+        If snapshot_path is given, a snapshot (see get_snapshot) is appended to it 
+        as a line of JSON every snapshot_interval seconds during a search and once 
+        at its end. label, if given, is included in every snapshot to tell apart 
+        runs writing to the same file.
+        
+        Searches report each expansion through begin_expansion, which also decides 
+        whether the expansion's phases are timed, and update the other counters 
+        directly.
+        """
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self.timing_sample_interval = timing_sample_interval
+        self.label = label
+        self.start_search(None)
+
+
+    def start_search(self, search_name):
+        """Resets the counters and timers for a new search with the given name."""
+        self.search_name = search_name
+
+        # Nodes taken off the frontier and expanded
+        self.num_expanded_nodes = 0
+
+        # Child nodes generated by expansions
+        self.num_generated_nodes = 0
+
+        # Generated nodes discarded because their state was already visited or queued
+        self.num_duplicate_hits = 0
+
+        # Already expanded states queued again after being reached at a smaller path cost
+        self.num_reopenings = 0
+
+        # Successors pruned by partial-order reduction (see AIDriver.get_reduced_actions)
+        self.num_reduced_successors = 0
+
+        # Successors pruned as the inverse of the last move, or as a return to a state on 
+        #  the current path, by the tree searches
+        self.num_inverse_successors = 0
+        self.num_cyclic_successors = 0
+
+        # Heuristic lookups answered by, and missing from, the AIDriver's heuristic cache
+        self.num_heuristic_cache_hits = 0
+        self.num_heuristic_cache_misses = 0
+
+        # Sizes of the frontier and the visited set at the latest expansion
+        self.frontier_size = 0
+        self.closed_size = 0
+        self.max_frontier_size = 0
+
+        # Seconds spent in each Phase during timed expansions
+        self.phase_times = dict.fromkeys(Phase, 0.0)
+
+        self.start_time = time.perf_counter()
+        self.next_snapshot_time = self.start_time + self.snapshot_interval
+        self.next_snapshot_check = SNAPSHOT_CHECK_INTERVAL
+
+
+    def begin_expansion(self, frontier_size, closed_size):
+        """Counts an expansion, given the current sizes of the frontier and the 
+        visited set, writing a snapshot if one is due.
+        
+        Returns True if the phases of this expansion should be timed, False otherwise.
+        """
+        self.num_expanded_nodes += 1
+        self.frontier_size = frontier_size
+        self.closed_size = closed_size
+
+        if frontier_size > self.max_frontier_size:
+            self.max_frontier_size = frontier_size
+        
+        if self.num_expanded_nodes >= self.next_snapshot_check:
+            self.next_snapshot_check += SNAPSHOT_CHECK_INTERVAL
+
+            if self.snapshot_path and time.perf_counter() >= self.next_snapshot_time:
+                self.write_snapshot()
+        
+        return self.num_expanded_nodes % self.timing_sample_interval == 0
+
+
+    def add_phase_time(self, phase, phase_start_time):
+        """Adds the time since phase_start_time (from time.perf_counter) to the given 
+        Phase, returning the current time so it can start the next phase.
+        """
+        now = time.perf_counter()
+        self.phase_times[phase] += now - phase_start_time
+        return now
+
+
+    def get_snapshot(self):
+        """Returns a dict of the current counters and sizes, the elapsed time and the 
+        estimated cumulative seconds spent in each phase.
+        
+        Phase times are estimated by splitting the elapsed time in proportion to the 
+        times measured on the sampled expansions, so the clock calls made while timing 
+        do not inflate them.
+        """
+        elapsed_time = time.perf_counter() - self.start_time
+        sampled_time = sum(self.phase_times.values())
+
+        return {'label': self.label, 'search': self.search_name, 'elapsed_time': elapsed_time, 
+            'num_expanded_nodes': self.num_expanded_nodes, 'num_generated_nodes': self.num_generated_nodes, 
+            'num_duplicate_hits': self.num_duplicate_hits, 'num_reopenings': self.num_reopenings, 
+            'num_reduced_successors': self.num_reduced_successors, 
+            'num_inverse_successors': self.num_inverse_successors, 
+            'num_cyclic_successors': self.num_cyclic_successors, 
+            'num_heuristic_cache_hits': self.num_heuristic_cache_hits, 
+            'num_heuristic_cache_misses': self.num_heuristic_cache_misses, 
+            'frontier_size': self.frontier_size, 'closed_size': self.closed_size, 
+            'max_frontier_size': self.max_frontier_size, 
+            'expansions_per_second': self.num_expanded_nodes / elapsed_time if elapsed_time else 0.0, 
+            'phase_times': {phase.name: elapsed_time * phase_time / sampled_time if sampled_time else 0.0 
+                for phase, phase_time in self.phase_times.items()}}
+
+
+    def write_snapshot(self):
+        """Appends the current snapshot to the snapshot file, if there is one."""
+        if not self.snapshot_path:
+            return
+        
+        with open(self.snapshot_path, 'a') as snapshot_file:
+            snapshot_file.write(json.dumps(self.get_snapshot()) + '\n')
+        
+        self.next_snapshot_time = time.perf_counter() + self.snapshot_interval
+
+
+    def end_search(self):
+        """Writes the final snapshot of the current search."""
+        self.write_snapshot()
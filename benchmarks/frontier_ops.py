@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+
+from ai.bucket_frontier import BucketFrontier
+from ai.priority_frontier import PriorityFrontier
+from util.args import Arguments
+from util.timer import Timer
+import gc
+import random
+
+
+# Constants
+# Command line argument processing
+DEFAULT_NUM_OPERATIONS = '1000000'
+DEFAULT_ARGUMENTS = [DEFAULT_NUM_OPERATIONS]
+DEFAULT_VALUES_STR = '  (1) Number of frontier operations to time'
+
+# Workload shape, loosely modeled on A*GS on the sample puzzles: every pop is 
+#  followed by a few inserts whose f-costs are at most a couple above the popped 
+#  node's, and some inserts re-key a node already in the frontier (its new f-cost 
+#  can be higher or lower than the old one)
+CHILDREN_PER_POP = 3
+MAX_F_COST_INCREASE = 2
+REKEY_PROBABILITY = 0.05
+SEED = 5400
+
+# Times each trace is replayed, the fastest replay is reported
+NUM_REPEATS = 5
+
+# Trace operations
+POP = 0
+INSERT = 1
+REKEY = 2
+
+
+class NullFrontier():
+    """A frontier whose operations do nothing, timed to measure the cost of 
+    replaying a trace alone.
+    """
+    def insert(self, node, heuristic):
+        pass
+
+
+    def remove_node(self, node):
+        pass
+
+
+    def pop(self):
+        return None
+
+
+def get_trace(num_operations):
+    """Returns a list of about num_operations (operation, node, priority) tuples 
+    making up the workload, recorded by running it on a PriorityFrontier.
+
+    PriorityFrontier and a FIFO BucketFrontier pop nodes of equal priority in the 
+    same order, so the same trace is valid for both and they do identical work.
+    """
+    generator = random.Random(SEED)
+    frontier = PriorityFrontier()
+    priorities = {0: 0}
+    next_node = 1
+    trace = [(INSERT, 0, 0)]
+
+    frontier.insert(0, 0)
+
+    while len(trace) < num_operations and not frontier.is_empty():
+        node = frontier.pop()
+        f_cost = priorities.pop(node)
+        trace.append((POP, node, None))
+
+        for _ in range(CHILDREN_PER_POP):
+            priority = f_cost + generator.randint(0, MAX_F_COST_INCREASE)
+
+            if generator.random() < REKEY_PROBABILITY and next_node - 1 in priorities:
+                # Re-key the most recently inserted node
+                child = next_node - 1
+                frontier.remove_node(child)
+                trace.append((REKEY, child, priority))
+            
+            else:
+                child = next_node
+                next_node += 1
+                trace.append((INSERT, child, priority))
+            
+            priorities[child] = priority
+            frontier.insert(child, priority)
+
+            if len(trace) >= num_operations:
+                break
+    
+    return trace
+
+
+def replay_trace(frontier, trace):
+    """Performs the operations of the given trace on the given frontier and returns 
+    the elapsed wall time in seconds and the list of nodes popped.
+    """
+    popped_nodes = []
+
+    # The frontier holds millions of entries, which the cyclic garbage collector would 
+    #  otherwise rescan over and over, swamping the frontier's own costs (as timeit does)
+    gc.disable()
+
+    timer = Timer()
+    timer.start()
+
+    for operation, node, priority in trace:
+        if operation == POP:
+            popped_nodes.append(frontier.pop())
+        
+        elif operation == INSERT:
+            frontier.insert(node, priority)
+        
+        else: # operation == REKEY
+            frontier.remove_node(node)
+            frontier.insert(node, priority)
+    
+    elapsed_time = timer.end()
+    gc.enable()
+
+    return elapsed_time, popped_nodes
+
+
+def time_trace(make_frontier, trace):
+    """Returns the fastest of NUM_REPEATS replays of the given trace, each on a new 
+    frontier from make_frontier, along with that frontier and its popped nodes.
+    """
+    best_time = None
+
+    for _ in range(NUM_REPEATS):
+        frontier = make_frontier()
+        elapsed_time, popped_nodes = replay_trace(frontier, trace)
+
+        if best_time is None or elapsed_time < best_time:
+            best_time = elapsed_time
+    
+    return best_time, frontier, popped_nodes
+
+
+if __name__ == '__main__':
+    # Process command line arguments
+    args = Arguments(len(DEFAULT_ARGUMENTS), DEFAULT_ARGUMENTS, DEFAULT_VALUES_STR)
+    num_operations = int(args.get_args()[0])
+
+    trace = get_trace(num_operations)
+    expected_pops = [node for operation, node, _ in trace if operation == POP]
+    baseline_time, _, _ = time_trace(NullFrontier, trace)
+
+    print('%d operations (%d pops), replay loop alone %.1f ns/op\n' % 
+        (len(trace), len(expected_pops), baseline_time / len(trace) * 1e9))
+
+    for name, make_frontier in [('Heap (PriorityFrontier)', PriorityFrontier), 
+            ('Bucket (BucketFrontier)', lambda: BucketFrontier(lifo=False))]:
+        elapsed_time, frontier, popped_nodes = time_trace(make_frontier, trace)
+
+        # Both frontiers must have done the same work for the times to compare
+        assert popped_nodes == expected_pops, '%s popped nodes out of order' % name
+
+        print('%-24s %8.1f ns/op net of the loop  (%d left in frontier)' % 
+            (name, (elapsed_time - baseline_time) / len(trace) * 1e9, len(frontier)))
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+
+from tj_wriggle.generator import Generator
+import argparse
+import os
+import time
+
+
+# Constants
+DEFAULT_OUTPUT_DIR = 'generated_puzzles'
+DEFAULT_COUNT = 100
+DEFAULT_SIZE = 50
+DEFAULT_WALL_DENSITY = 0.2
+DEFAULT_NUM_WRIGGLERS = 100
+DEFAULT_WRIGGLER_LENGTH = 5
+DEFAULT_DEPTH = 200
+DEFAULT_SEED = 0
+
+
+def generate_corpus(output_dir, count, width, height, wall_density, num_wrigglers, wriggler_length,
+        depth, seed):
+    """Writes count generated puzzles to output_dir as puzzle0.txt, puzzle1.txt and so
+    on, and returns the list of their paths.
+
+    Puzzle n is generated from seed + n, so any single puzzle of a corpus can be rebuilt
+    on its own.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    puzzle_paths = []
+
+    for index in range(count):
+        generator = Generator(width, height, wall_density, num_wrigglers, wriggler_length, seed + index)
+        puzzle, initial_state = generator.generate(depth)
+
+        puzzle_path = os.path.join(output_dir, 'puzzle%d.txt' % index)
+        Generator.write_puzzle_file(puzzle_path, puzzle, initial_state)
+        puzzle_paths.append(puzzle_path)
+
+    return puzzle_paths
+
+
+if __name__ == '__main__':
+    # Process command line arguments
+    parser = argparse.ArgumentParser(description='Generates a corpus of random, solvable TJ-Wriggle puzzles.')
+    parser.add_argument('output_dir', nargs='?', default=DEFAULT_OUTPUT_DIR,
+        help='Directory the puzzle files are written to (default: %s)' % DEFAULT_OUTPUT_DIR)
+    parser.add_argument('--count', type=int, default=DEFAULT_COUNT,
+        help='Number of puzzles to generate (default: %d)' % DEFAULT_COUNT)
+    parser.add_argument('--width', type=int, default=DEFAULT_SIZE,
+        help='Board width (default: %d)' % DEFAULT_SIZE)
+    parser.add_argument('--height', type=int, default=DEFAULT_SIZE,
+        help='Board height (default: %d)' % DEFAULT_SIZE)
+    parser.add_argument('--wall-density', type=float, default=DEFAULT_WALL_DENSITY,
+        help='Fraction of cells filled with walls (default: %.2f)' % DEFAULT_WALL_DENSITY)
+    parser.add_argument('--wrigglers', type=int, default=DEFAULT_NUM_WRIGGLERS,
+        help='Number of wrigglers (default: %d)' % DEFAULT_NUM_WRIGGLERS)
+    parser.add_argument('--length', type=int, default=DEFAULT_WRIGGLER_LENGTH,
+        help='Body segments per wriggler, at least 2 (default: %d)' % DEFAULT_WRIGGLER_LENGTH)
+    parser.add_argument('--depth', type=int, default=DEFAULT_DEPTH,
+        help='Scramble moves away from the goal, an upper bound on the solution length (default: %d)' % DEFAULT_DEPTH)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+        help='Seed of the first puzzle, later puzzles use the following seeds (default: %d)' % DEFAULT_SEED)
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    puzzle_paths = generate_corpus(args.output_dir, args.count, args.width, args.height, args.wall_density,
+        args.wrigglers, args.length, args.depth, args.seed)
+
+    print('Generated %d puzzles in %s in %.2fs' % (len(puzzle_paths), args.output_dir,
+        time.perf_counter() - start_time))
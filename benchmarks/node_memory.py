@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+
+from ai.node_arena import NO_PARENT, NodeArena
+from ai.search_node import SearchNode
+from tj_wriggle.decoder import Decoder
+from util.args import Arguments
+import tracemalloc
+
+
+# Constants
+# Command line argument processing
+DEFAULT_PUZZLE_PATH = 'puzzle4.txt'
+DEFAULT_NUM_NODES = '100000'
+DEFAULT_ARGUMENTS = [DEFAULT_PUZZLE_PATH, DEFAULT_NUM_NODES]
+DEFAULT_VALUES_STR = '  (1) Puzzle file path\n  (2) Number of search nodes to generate'
+
+
+def generate_nodes(initial_state, puzzle, num_nodes):
+    """Returns a list of num_nodes search nodes generated breadth-first from 
+    the given initial state, keeping every node alive the way a graph search's 
+    visited set would.
+    """
+    nodes = [SearchNode(initial_state)]
+    index = 0
+
+    while len(nodes) < num_nodes:
+        node = nodes[index]
+        index += 1
+        
+        for action in puzzle.get_actions(node.state):
+            nodes.append(SearchNode(puzzle.get_result(node.state, action), node, action))
+    
+    return nodes[:num_nodes]
+
+
+def generate_arena_nodes(initial_state, puzzle, num_nodes):
+    """Returns a (NodeArena, states) tuple holding the same num_nodes nodes as 
+    generate_nodes, with the nodes stored in the arena and their states in a list.
+    """
+    arena = NodeArena()
+    arena.add(NO_PARENT, 0, 1, 0)
+    states = [initial_state]
+    index = 0
+
+    while len(states) < num_nodes:
+        state = states[index]
+        
+        for action in puzzle.get_actions(state):
+            arena.add(index, puzzle.encode_action(state, action), arena.get_path_cost(index) + 1, 0)
+            states.append(puzzle.get_result(state, action))
+        
+        index += 1
+    
+    return arena, states[:num_nodes]
+
+
+def measure_bytes(generate, *args):
+    """Returns a (result, bytes) tuple of the result of generate(*args) and the
+    number of bytes of memory it still holds.
+    """
+    tracemalloc.start()
+    baseline_bytes = tracemalloc.get_traced_memory()[0]
+    result = generate(*args)
+    result_bytes = tracemalloc.get_traced_memory()[0] - baseline_bytes
+    tracemalloc.stop()
+
+    return result, result_bytes
+
+
+if __name__ == '__main__':
+    # Process command line arguments
+    args = Arguments(len(DEFAULT_ARGUMENTS), DEFAULT_ARGUMENTS, DEFAULT_VALUES_STR)
+    puzzle_path, num_nodes = args.get_args()
+    num_nodes = int(num_nodes)
+
+    # Decode puzzle
+    puzzle_decoder = Decoder(puzzle_path)
+    initial_state = puzzle_decoder.get_initial_state()
+    puzzle = puzzle_decoder.get_puzzle()
+    
+    # Measure the memory held by the generated nodes, their states and their actions
+    nodes, node_bytes = measure_bytes(generate_nodes, initial_state, puzzle, num_nodes)
+    del nodes
+
+    # Measure the same nodes stored in an arena, with their states kept alongside
+    (arena, states), arena_bytes = measure_bytes(generate_arena_nodes, initial_state, puzzle, num_nodes)
+    
+    print('Nodes generated: %d' % len(states))
+    print('Bytes per node:  %.1f (SearchNode), %.1f (NodeArena)' % (node_bytes / len(states), arena_bytes / len(states)))
+
+    # The arena's own share, without the states
+    column_bytes = sum([column.itemsize * len(column) for column in 
+        (arena.parent_indices, arena.action_codes, arena.path_costs, arena.heuristics)])
+    print('Arena columns:   %.1f bytes per node' % (column_bytes / len(arena)))
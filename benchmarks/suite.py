@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+
+
+from ai.driver import AIDriver
+from ai.heuristic import Heuristic
+from tj_wriggle.decoder import Decoder
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import signal
+import statistics
+import sys
+import time
+import tracemalloc
+
+
+# Constants
+# Puzzles every configuration is run on
+DEFAULT_CORPUS = ['puzzle1.txt', 'puzzle2.txt', 'puzzle3.txt', 'puzzle4.txt']
+
+# AIDriver search methods benchmarked, those in UNINFORMED_ALGORITHMS are run once per
+#  puzzle rather than once per heuristic as they ignore it
+ALGORITHMS = ['bfts', 'bfgs', 'id_dfts', 'external_bfs', 'grbefgs', 'a_star_gs', 'weighted_a_star', 'ara_star',
+    'ida_star', 'beam_search', 'hda_star']
+UNINFORMED_ALGORITHMS = {'bfts', 'bfgs', 'id_dfts', 'external_bfs'}
+
+# Tree searches benchmarked once per pruning setting, with the AIDriver arguments of
+#  each setting
+TREE_SEARCH_ALGORITHMS = {'bfts', 'id_dfts'}
+PRUNING_SETTINGS = {
+    'none': {},
+    'inverse': {'prune_inverse_moves': True},
+    'cycles': {'check_cycles': True},
+    'por': {'partial_order_reduction': True},
+    'all': {'prune_inverse_moves': True, 'check_cycles': True, 'partial_order_reduction': True},
+}
+DEFAULT_PRUNING_SETTINGS = ['none', 'all']
+
+# Search methods whose telemetry times the phases of their expansions, the others
+#  report no phase times
+PHASE_TIMED_ALGORITHMS = {'a_star_gs', 'weighted_a_star'}
+
+# Runs before the timed ones, the first of which measures peak memory
+DEFAULT_WARMUPS = 1
+
+# Timed runs per configuration
+DEFAULT_REPEATS = 3
+
+# Time limit per run in seconds, and address space limit per configuration in megabytes
+DEFAULT_TIMEOUT = 60
+DEFAULT_MEMORY_LIMIT = 2048
+
+DEFAULT_OUTPUT_PATH = 'benchmark_results.json'
+DEFAULT_BASELINE_PATH = 'benchmarks/baseline.json'
+
+# Relative increases over the baseline reported as regressions
+#  Expansions and solution lengths are deterministic, so any increase is reported
+DEFAULT_TIME_THRESHOLD = 0.25
+DEFAULT_MEMORY_THRESHOLD = 0.25
+
+# Median time increases smaller than this many seconds are never reported, since timing
+#  noise dominates the shortest runs
+DEFAULT_MIN_TIME_DELTA = 0.01
+
+
+class BenchmarkTimeout(Exception):
+    """Raised in a benchmark process when a run passes its time limit."""
+
+
+def get_configurations(puzzle_paths, algorithms, heuristics, pruning_names):
+    """Returns a list of the (puzzle path, algorithm, heuristic name, pruning name)
+    configurations to run, with a heuristic name of None for uninformed algorithms
+    and a pruning name (a key of PRUNING_SETTINGS) of None for all but the tree 
+    searches.
+    """
+    configurations = []
+
+    for puzzle_path in puzzle_paths:
+        for algorithm in algorithms:
+            if algorithm in TREE_SEARCH_ALGORITHMS:
+                for pruning_name in pruning_names:
+                    configurations.append((puzzle_path, algorithm, None, pruning_name))
+                
+                continue
+
+            if algorithm in UNINFORMED_ALGORITHMS:
+                configurations.append((puzzle_path, algorithm, None, None))
+                continue
+
+            for heuristic in heuristics:
+                configurations.append((puzzle_path, algorithm, heuristic.name, None))
+
+    return configurations
+
+
+def run_configuration(configuration, warmups, repeats, timeout, memory_limit, connection):
+    """Benchmarks one configuration inside its own process, sending a result dict
+    through connection.
+
+    The first warm-up run is traced with tracemalloc to measure peak memory, the
+    timed runs are not traced. Each run is stopped after timeout seconds, and the
+    process may not use more than memory_limit megabytes of address space.
+    """
+    def handle_timeout(signum, frame):
+        raise BenchmarkTimeout()
+
+    puzzle_path, algorithm, heuristic_name, pruning_name = configuration
+    result = {'puzzle_path': puzzle_path, 'algorithm': algorithm, 'heuristic': heuristic_name,
+        'pruning': pruning_name, 'status': 'ok', 'times': [], 'peak_memory': None, 'num_expanded_nodes': None,
+        'solution_length': None, 'phase_times': None}
+
+    memory_limit_bytes = memory_limit * 2 ** 20
+    resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+    signal.signal(signal.SIGALRM, handle_timeout)
+
+    try:
+        # Silence search progress output
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            puzzle_decoder = Decoder(puzzle_path)
+            heuristic = Heuristic[heuristic_name] if heuristic_name else Heuristic.MANHATTAN_DIST
+            ai_driver = AIDriver(puzzle_decoder.get_initial_state(), puzzle_decoder.get_puzzle(), heuristic,
+                **PRUNING_SETTINGS.get(pruning_name, {}))
+            search = getattr(ai_driver, algorithm)
+
+            for run_index in range(warmups + repeats):
+                measure_memory = run_index == 0
+
+                if measure_memory:
+                    tracemalloc.start()
+
+                signal.setitimer(signal.ITIMER_REAL, timeout)
+                start_time = time.perf_counter()
+                search_result = search()
+                elapsed_time = time.perf_counter() - start_time
+                signal.setitimer(signal.ITIMER_REAL, 0)
+
+                if measure_memory:
+                    result['peak_memory'] = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+
+                if run_index >= warmups:
+                    result['times'].append(elapsed_time)
+
+        if search_result.solution:
+            result['solution_length'] = len(search_result.solution.actions)
+
+        else:
+            result['status'] = 'unsolved'
+
+        # Searches whose results do not count their nodes report them through the telemetry
+        result['num_expanded_nodes'] = getattr(search_result, 'num_expanded_nodes', 
+            ai_driver.telemetry.num_generated_nodes)
+
+        if algorithm in PHASE_TIMED_ALGORITHMS:
+            result['phase_times'] = ai_driver.telemetry.get_snapshot()['phase_times']
+
+    except BenchmarkTimeout:
+        result['status'] = 'timeout'
+
+    except MemoryError:
+        result['status'] = 'out_of_memory'
+
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+    if result['times']:
+        result['median_time'] = statistics.median(result['times'])
+        result['min_time'] = min(result['times'])
+
+    connection.send(result)
+
+
+def run_suite(configurations, warmups, repeats, timeout, memory_limit):
+    """Benchmarks each configuration in a fresh process, one at a time, printing
+    each result as it finishes. Returns a list of the result dicts.
+    """
+    results = []
+
+    for configuration_index, configuration in enumerate(configurations, 1):
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=run_configuration,
+            args=(configuration, warmups, repeats, timeout, memory_limit, sender))
+        process.start()
+        sender.close()
+
+        # Every run has its own time limit, this only catches processes that die or hang
+        if receiver.poll(timeout * (warmups + repeats) + timeout):
+            try:
+                result = receiver.recv()
+
+            except EOFError:
+                result = None
+
+        else:
+            result = None
+
+        if process.is_alive():
+            process.terminate()
+
+        process.join()
+
+        if result is None:
+            puzzle_path, algorithm, heuristic_name, pruning_name = configuration
+            result = {'puzzle_path': puzzle_path, 'algorithm': algorithm, 'heuristic': heuristic_name,
+                'pruning': pruning_name, 'status': 'crashed', 'times': []}
+
+        results.append(result)
+        print_result(configuration_index, len(configurations), result)
+
+    return results
+
+
+def print_result(configuration_index, num_configurations, result):
+    """Prints a one line summary of a configuration's result."""
+    def format_value(value, format_str):
+        return '-' if value is None else format_str % value
+
+    peak_memory = result.get('peak_memory')
+
+    print('[%d/%d] %-12s %-16s %-15s %-8s %-13s %10s s %12s nodes %10s MiB %6s moves' % (configuration_index,
+        num_configurations, result['puzzle_path'], result['algorithm'], result['heuristic'] or '-',
+        result.get('pruning') or '-', result['status'], format_value(result.get('median_time'), '%.4f'),
+        format_value(result.get('num_expanded_nodes'), '%d'),
+        format_value(peak_memory / 2 ** 20 if peak_memory is not None else None, '%.1f'),
+        format_value(result.get('solution_length'), '%d')))
+
+
+def get_result_key(result):
+    """Returns the (puzzle path, algorithm, heuristic name, pruning name) key of a 
+    result dict. Tree search results saved before pruning settings were benchmarked 
+    ran without pruning.
+    """
+    pruning_name = result.get('pruning')
+
+    if pruning_name is None and result['algorithm'] in TREE_SEARCH_ALGORITHMS:
+        pruning_name = 'none'
+
+    return (result['puzzle_path'], result['algorithm'], result['heuristic'], pruning_name)
+
+
+def compare_results(results, baseline_results, time_threshold, memory_threshold, min_time_delta):
+    """Compares results against baseline_results, both lists of result dicts,
+    printing every regression found.
+
+    A regression is a median time or peak memory more than time_threshold or
+    memory_threshold (relative) above the baseline's, more expanded nodes, a longer
+    solution, or a configuration that no longer completes. Median times must also 
+    be at least min_time_delta seconds above the baseline's. Returns the number of
+    regressions.
+    """
+    baseline_dict = {get_result_key(result): result for result in baseline_results}
+    regressions = []
+
+    for result in results:
+        baseline = baseline_dict.get(get_result_key(result))
+
+        if baseline is None or baseline['status'] != 'ok':
+            # Nothing to compare against
+            continue
+
+        name = '%s %s %s' % (result['puzzle_path'], result['algorithm'], result['heuristic'] or result.get('pruning') or '-')
+
+        if result['status'] != 'ok':
+            regressions.append('%s: status %s (baseline ok)' % (name, result['status']))
+            continue
+
+        for metric, threshold in (('median_time', time_threshold), ('peak_memory', memory_threshold),
+                ('num_expanded_nodes', 0), ('solution_length', 0)):
+            current_value = result.get(metric)
+            baseline_value = baseline.get(metric)
+
+            if current_value is None or baseline_value is None:
+                continue
+
+            if metric == 'median_time' and current_value - baseline_value < min_time_delta:
+                continue
+
+            if current_value > baseline_value * (1 + threshold):
+                regressions.append('%s: %s %.4g -> %.4g (%+.1f%%)' % (name, metric, baseline_value, current_value,
+                    100 * (current_value / baseline_value - 1) if baseline_value else float('inf')))
+
+    print('\n%d regression(s) against the baseline' % len(regressions))
+
+    for regression in regressions:
+        print('  ' + regression)
+
+    return len(regressions)
+
+
+def write_results(path, results, args):
+    """Writes the results and the settings and machine they were measured with to
+    a JSON file at path.
+    """
+    metadata = {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': sys.version.split()[0],
+        'platform': platform.platform(), 'cpu_count': os.cpu_count(), 'warmups': args.warmups,
+        'repeats': args.repeats, 'timeout': args.timeout}
+
+    with open(path, 'w') as results_file:
+        json.dump({'metadata': metadata, 'results': results}, results_file, indent=1)
+
+    print('Results written to ' + path)
+
+
+if __name__ == '__main__':
+    # Process command line arguments
+    parser = argparse.ArgumentParser(description='Benchmarks every search algorithm and heuristic on a puzzle corpus.')
+    parser.add_argument('--puzzles', nargs='+', default=DEFAULT_CORPUS, help='Puzzle files to benchmark')
+    parser.add_argument('--algorithms', nargs='+', default=ALGORITHMS, choices=ALGORITHMS,
+        help='AIDriver search methods to benchmark')
+    parser.add_argument('--heuristics', nargs='+', default=[heuristic.name for heuristic in Heuristic],
+        choices=[heuristic.name for heuristic in Heuristic], help='Heuristics to benchmark')
+    parser.add_argument('--pruning', nargs='+', default=DEFAULT_PRUNING_SETTINGS, choices=list(PRUNING_SETTINGS),
+        help='Pruning settings the tree searches are benchmarked with (default: %s)' % ' '.join(DEFAULT_PRUNING_SETTINGS))
+    parser.add_argument('--warmups', type=int, default=DEFAULT_WARMUPS,
+        help='Untimed runs per configuration, at least 1 (default: %d)' % DEFAULT_WARMUPS)
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS,
+        help='Timed runs per configuration (default: %d)' % DEFAULT_REPEATS)
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+        help='Time limit per run, in seconds (default: %d)' % DEFAULT_TIMEOUT)
+    parser.add_argument('--memory-limit', type=int, default=DEFAULT_MEMORY_LIMIT,
+        help='Address space limit per configuration, in megabytes (default: %d)' % DEFAULT_MEMORY_LIMIT)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT_PATH,
+        help='JSON file the results are written to (default: %s)' % DEFAULT_OUTPUT_PATH)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH,
+        help='Baseline JSON file the results are compared against (default: %s)' % DEFAULT_BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true',
+        help='Also write the results to the baseline file instead of comparing against it')
+    parser.add_argument('--time-threshold', type=float, default=DEFAULT_TIME_THRESHOLD,
+        help='Relative median time increase reported as a regression (default: %.2f)' % DEFAULT_TIME_THRESHOLD)
+    parser.add_argument('--memory-threshold', type=float, default=DEFAULT_MEMORY_THRESHOLD,
+        help='Relative peak memory increase reported as a regression (default: %.2f)' % DEFAULT_MEMORY_THRESHOLD)
+    parser.add_argument('--min-time-delta', type=float, default=DEFAULT_MIN_TIME_DELTA,
+        help='Smallest median time increase reported as a regression, in seconds (default: %.2f)' % DEFAULT_MIN_TIME_DELTA)
+    args = parser.parse_args()
+
+    configurations = get_configurations(args.puzzles, args.algorithms,
+        [Heuristic[heuristic_name] for heuristic_name in args.heuristics], args.pruning)
+
+    print('Benchmarking %d configurations...\n' % len(configurations))
+
+    results = run_suite(configurations, max(1, args.warmups), args.repeats, args.timeout, args.memory_limit)
+
+    print()
+    write_results(args.output, results, args)
+
+    if args.save_baseline:
+        write_results(args.baseline, results, args)
+
+    elif os.path.isfile(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline_results = json.load(baseline_file)['results']
+
+        if compare_results(results, baseline_results, args.time_threshold, args.memory_threshold,
+                args.min_time_delta):
+            sys.exit(1)
+
+    else:
+        print('No baseline at %s, run with --save-baseline to create one' % args.baseline)
@@ -1,61 +1,182 @@
 #!/usr/bin/env python3
 
 
-from ai.driver import AIDriver
+from ai.driver import DEFAULT_EXTERNAL_MEMORY_LIMIT, AIDriver
 from ai.heuristic import Heuristic
+from ai.telemetry import Telemetry
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from queue import Empty
 from tj_wriggle.decoder import Decoder
-from util.args import Arguments
+from tj_wriggle.solution_cache import DEFAULT_CACHE_PATH, SolutionCache
 from util.timer import Timer
+import argparse
+import contextlib
+import glob
+import json
+import multiprocessing
 import numpy
+import os
 import os.path
+import signal
+import sys
+import time
 
 
 # Constants
 # Command line argument processing
 DEFAULT_PUZZLE_PATH = 'puzzle1.txt'
 DEFAULT_SOLN_PATH = 'solution1.txt'
-DEFAULT_ARGUMENTS = [DEFAULT_PUZZLE_PATH, DEFAULT_SOLN_PATH]
-DEFAULT_VALUES_STR = '  (1) Puzzle file path\n  (2) Solution file path'
+
+# Default time limit for each puzzle in batch mode, in seconds
+DEFAULT_TIMEOUT = 600
     
 # Heuristic to use
 #  Heuristic.MANHATTAN_DIST: Smallest Manhattan distance between the wriggler's 
 #    head/tail and the goal coordinate
 #  Heuristic.NUM_OBSTACLES:  Number of obstacles between the wriggler's head/tail 
 #    (whichever is closer to the goal) and the goal coordinate
-HEURISTIC = Heuristic.MANHATTAN_DIST
+#  Heuristic.PATTERN_DB:     Exact number of moves the wriggler needs to reach the goal 
+#    when only it and a subset of the other wrigglers are on the board (precomputed 
+#    and saved to pattern_db_cache/)
+#  Heuristic.GOAL_DIST:      Smallest distance, around walls, between the wriggler's 
+#    head/tail and the goal coordinate
+HEURISTIC = Heuristic.GOAL_DIST
 
+# Configurations raced against each other in portfolio mode, as 
+#  (AIDriver search method, Heuristic) pairs
+PORTFOLIO = [
+    ('a_star_gs', Heuristic.GOAL_DIST),
+    ('a_star_gs', Heuristic.MANHATTAN_DIST),
+    ('ida_star', Heuristic.GOAL_DIST),
+    ('grbefgs', Heuristic.GOAL_DIST),
+    ('grbefgs', Heuristic.NUM_OBSTACLES),
+]
 
-if __name__ == '__main__':
-    # Process command line arguments
-    args = Arguments(len(DEFAULT_ARGUMENTS), DEFAULT_ARGUMENTS, DEFAULT_VALUES_STR)
-    puzzle_path, soln_path = args.get_args()
+# Search methods that always return a shortest solution, given an admissible heuristic
+OPTIMAL_ALGORITHMS = {'bfts', 'bfgs', 'id_dfts', 'external_bfs', 'a_star_gs', 'ida_star', 'hda_star', 'ara_star'}
+
+# Every AIDriver search method a configuration can name
+SEARCH_ALGORITHMS = OPTIMAL_ALGORITHMS | {'grbefgs', 'weighted_a_star', 'beam_search'}
+
+# Search methods that ignore the heuristic
+UNINFORMED_ALGORITHMS = {'bfts', 'bfgs', 'id_dfts', 'external_bfs'}
+
+# Heuristics that never overestimate the number of moves left
+ADMISSIBLE_HEURISTICS = {Heuristic.MANHATTAN_DIST, Heuristic.PATTERN_DB, Heuristic.GOAL_DIST}
+
+# Solution requirements in portfolio mode
+#  any:     The first solution found by any configuration wins
+#  optimal: Only configurations guaranteed to find a shortest solution are raced
+OPTIMALITY_REQUIREMENTS = ['any', 'optimal']
+
+# File each portfolio race's winning configuration is appended to, one JSON object per line
+DEFAULT_PORTFOLIO_LOG_PATH = 'portfolio_log.jsonl'
+
+
+class SolveTimeout(Exception):
+    """Raised in a batch worker when a puzzle runs past its time limit."""
+
+
+def get_b_star(num_expanded_nodes, max_depth):
+    """Returns the effective branching factor b* for a search that expanded
+    num_expanded_nodes nodes and reached max_depth, or None if it cannot be found.
+    """
+    # b_star^(d + 1) - (N + 1)*b_star + N = 0
+    N = num_expanded_nodes
+    d = max_depth
     
-    # Check to see if the puzzle path exists
-    if not os.path.isfile(puzzle_path):
-        # This path is invalid
-        print('Invalid puzzle path \'%s\'' % puzzle_path)
-            
-        # Replace this puzzle path with a default puzzle path
-        puzzle_path = DEFAULT_PUZZLE_PATH
-        
-    # Inform the user which puzzle is being solved
-    print('Solving', puzzle_path + '...')
+    # Construct the coefficient list in accordance with the above equation
+    coefficients = [N, -1 * N - 1]
+
+    # Set coefficients from b_star^2 to b_star^(d + 1) to 0
+    coefficients += [0] * d
+
+    # Reset coefficient of b_star^(d + 1) to 1
+    coefficients[-1] = 1
+
+    # Reverse the coefficient list to the order that numpy expects
+    coefficients = coefficients[::-1]
+    
+    # Generate the solutions
+    solution_list = numpy.roots(coefficients)
 
+    # Only take real valued solutions
+    solution_list = [numpy.real(solution) for solution in solution_list[numpy.isreal(solution_list)]]
+
+    # Find the valid solution
+    for possible_solution in solution_list:
+        if possible_solution > 1:
+            return float(possible_solution)
+    
+    return None
+
+
+def solve_puzzle(puzzle_path, soln_path, cache_path=DEFAULT_CACHE_PATH, telemetry_path=None, 
+        external_memory_limit=None, work_dir=None, pruning_options=None):
+    """Solves the puzzle at puzzle_path, writing the solution file to soln_path.
+    
+    The puzzle is searched with A*GS, or if external_memory_limit is given with an 
+    external-memory BFS buffering that many bytes of states, its layers stored under 
+    work_dir (see AIDriver.external_bfs).
+    
+    If cache_path is given, the SolutionCache there is checked first: on a hit the
+    search is skipped and the cached solution file is written as it was when the
+    puzzle was first solved, and on a miss the search's solution is cached if it is 
+    guaranteed to be optimal (see is_optimal_config). If 
+    telemetry_path is given, the search's telemetry snapshots are appended to it.
+
+    pruning_options is a dict of the AIDriver tree search pruning arguments 
+    (partial_order_reduction, prune_inverse_moves and check_cycles) to solve with.
+    
+    Returns a summary dict with the puzzle path, a status ('solved', 'cached' or 
+    'unsolved'), the search's wall time, the number of expanded nodes, the solution 
+    length and b*.
+    """
     # Decode puzzle
     puzzle_decoder = Decoder(puzzle_path)
     
     # Store decoded puzzle information
     initial_state = puzzle_decoder.get_initial_state()
     puzzle = puzzle_decoder.get_puzzle()
+
+    timer = Timer()
+    timer.start()
+
+    if cache_path:
+        solution_cache = SolutionCache(cache_path)
+        cache_key = SolutionCache.get_puzzle_key(puzzle, initial_state)
+        cache_entry = solution_cache.get(cache_key, puzzle)
+
+        if cache_entry:
+            # Skip the search
+            actions, final_state, stats = cache_entry
+            print('Found a cached solution, first found in %.3fs.' % stats['wall_time'])
+
+            puzzle.write_solution_file(soln_path, puzzle_path, actions, final_state, stats['wall_time'])
+
+            return {'puzzle_path': puzzle_path, 'status': 'cached', 'wall_time': timer.end(), 
+                'num_expanded_nodes': stats['num_expanded_nodes'], 'solution_length': len(actions), 
+                'b_star': stats['b_star']}
     
     # Create AI Driver
-    ai_driver = AIDriver(initial_state, puzzle, HEURISTIC)
+    telemetry = Telemetry(snapshot_path=telemetry_path, label=puzzle_path)
+    ai_driver = AIDriver(initial_state, puzzle, HEURISTIC, telemetry=telemetry, **(pruning_options or {}))
     
     # Execute tree search
-    timer = Timer()
     timer.start()
-    result = ai_driver.a_star_gs()
+
+    if external_memory_limit:
+        algorithm = 'external_bfs'
+        result = ai_driver.external_bfs(work_dir, external_memory_limit)
+    
+    else:
+        algorithm = 'a_star_gs'
+        result = ai_driver.a_star_gs()
+    
     elapsed_time = timer.end()
+
+    summary = {'puzzle_path': puzzle_path, 'status': 'unsolved', 'wall_time': elapsed_time, 
+        'num_expanded_nodes': result.num_expanded_nodes, 'solution_length': None, 'b_star': None}
     
     # Check the result
     if result.solution:
@@ -63,43 +184,422 @@ if __name__ == '__main__':
         print('\nSolution found.')
             
         # Calculate the effective branching factor b_star
-        # b_star^(d + 1) - (N + 1)*b_star + N = 0
-        N = result.num_expanded_nodes
-        d = result.max_depth
+        b_star = get_b_star(result.num_expanded_nodes, result.max_depth)
         
-        # Construct the coefficient list in accordance with the above equation
-        coefficients = [N, -1 * N - 1]
+        if b_star:
+            print('b* = %.5f' % b_star)
 
-        # Set coefficients from b_star^2 to b_star^(d + 1) to 0
-        coefficients += [0] * d
+        else:
+            print('b* could not be found')
+        
+        # Generate solution file
+        puzzle.write_solution_file(soln_path, puzzle_path, result.solution.actions, result.solution.final_state, elapsed_time)
 
-        # Reset coefficient of b_star^(d + 1) to 1
-        coefficients[-1] = 1
+        summary.update(status='solved', solution_length=len(result.solution.actions), b_star=b_star)
 
-        # Reverse the coefficient list to the order that numpy expects
-        coefficients = coefficients[::-1]
+        # The cache is keyed by puzzle alone and its solutions are trusted to be shortest, 
+        #  so solutions found with an inadmissible heuristic are not cached
+        if cache_path and is_optimal_config(algorithm, HEURISTIC):
+            solution_cache.put(cache_key, result.solution.actions, result.solution.final_state, 
+                {'algorithm': algorithm, 'heuristic': HEURISTIC.name, 'wall_time': elapsed_time, 
+                'num_expanded_nodes': result.num_expanded_nodes, 'max_depth': result.max_depth, 'b_star': b_star})
         
-        # Generate the solutions
-        solution_list = numpy.roots(coefficients)
+    else:
+        print('\nCould not find a solution.\n')
+    
+    return summary
 
-        # Only take real valued solutions
-        solution_list = [numpy.real(solution) for solution in solution_list[numpy.isreal(solution_list)]]
 
-        # Find the valid solution
-        solution = None
-        for possible_solution in solution_list:
-            if possible_solution > 1:
-                solution = possible_solution
-                break
+def solve_puzzle_in_worker(puzzle_path, soln_path, timeout, cache_path, telemetry_path, external_memory_limit, 
+        work_dir, pruning_options):
+    """Solves a puzzle inside a batch worker process, stopping after timeout seconds.
+    
+    Returns the summary dict of solve_puzzle, with a status of 'timeout' or 'invalid'
+    if the puzzle ran out of time or could not be decoded, or 'error' along with the 
+    error's message if solving it raised any other exception.
+    """
+    def handle_timeout(signum, frame):
+        raise SolveTimeout()
+    
+    summary = {'puzzle_path': puzzle_path, 'wall_time': None, 'num_expanded_nodes': None, 
+        'solution_length': None, 'b_star': None}
+
+    # Interrupt the search with SIGALRM once the time limit passes
+    signal.signal(signal.SIGALRM, handle_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    try:
+        # Silence per-puzzle progress output, the parent process reports each result
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            return solve_puzzle(puzzle_path, soln_path, cache_path, telemetry_path, external_memory_limit, work_dir, 
+                pruning_options)
+    
+    except SolveTimeout:
+        summary.update(status='timeout', wall_time=timeout)
+        return summary
+    
+    except SystemExit:
+        # The decoder exits on badly formatted puzzle files
+        summary.update(status='invalid')
+        return summary
+    
+    except Exception as error:
+        # One bad puzzle must not take the rest of the batch down with it
+        summary.update(status='error', error='%s: %s' % (type(error).__name__, error))
+        return summary
+    
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def is_optimal_config(algorithm, heuristic):
+    """Returns True if the given search method is guaranteed to return a shortest 
+    solution when run with the given heuristic, False otherwise.
+    """
+    if algorithm not in OPTIMAL_ALGORITHMS:
+        return False
+    
+    return algorithm in UNINFORMED_ALGORITHMS or heuristic in ADMISSIBLE_HEURISTICS
+
+
+def parse_configs(configs_str):
+    """Returns a list of (search method, Heuristic) pairs parsed from a comma 
+    separated list of algorithm:HEURISTIC strings, such as 'a_star_gs:GOAL_DIST'.
+
+    Raises argparse.ArgumentTypeError for an algorithm not in SEARCH_ALGORITHMS or 
+    an unknown heuristic.
+    """
+    configs = []
+
+    for config_str in configs_str.split(','):
+        algorithm, _, heuristic_name = config_str.strip().partition(':')
+
+        if algorithm not in SEARCH_ALGORITHMS:
+            raise argparse.ArgumentTypeError('unknown search method \'%s\' (choose from %s)' % 
+                (algorithm, ', '.join(sorted(SEARCH_ALGORITHMS))))
         
-        if solution:
-            print('b* = %.5f' % solution)
+        heuristic_name = heuristic_name or HEURISTIC.name
 
-        else:
-            print('b* could not be found')
+        if heuristic_name not in Heuristic.__members__:
+            raise argparse.ArgumentTypeError('unknown heuristic \'%s\' (choose from %s)' % 
+                (heuristic_name, ', '.join(Heuristic.__members__)))
         
-        # Generate solution file
-        puzzle.write_solution_file(soln_path, puzzle_path, result.solution.actions, result.solution.final_state, elapsed_time)
+        configs.append((algorithm, Heuristic[heuristic_name]))
+    
+    return configs
+
+
+def solve_with_config(puzzle_path, algorithm, heuristic, config_index, result_queue, telemetry_path=None, 
+        pruning_options=None):
+    """Searches the puzzle at puzzle_path with the given search method and heuristic 
+    inside a portfolio racing process, putting (config_index, result) on result_queue.
+
+    If telemetry_path is given, the search's telemetry snapshots are appended to it.
+    pruning_options is passed to the AIDriver as in solve_puzzle.
+    """
+    # Silence search progress output, the parent process reports the race's result
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        puzzle_decoder = Decoder(puzzle_path)
+        telemetry = Telemetry(snapshot_path=telemetry_path, label='%s %s:%s' % (puzzle_path, algorithm, heuristic.name))
+        ai_driver = AIDriver(puzzle_decoder.get_initial_state(), puzzle_decoder.get_puzzle(), heuristic, 
+            telemetry=telemetry, **(pruning_options or {}))
+        result = getattr(ai_driver, algorithm)()
+
+    result_queue.put((config_index, result))
+
+
+def race_portfolio(puzzle_path, soln_path, configs, optimality, timeout, log_path, 
+        cache_path=DEFAULT_CACHE_PATH, telemetry_path=None, pruning_options=None):
+    """Races the given (search method, Heuristic) configurations on the puzzle at 
+    puzzle_path, one process each. The first configuration to find a solution that 
+    meets the optimality requirement wins and every other process is terminated.
+    
+    The winner's solution is written to soln_path and the race is appended to the 
+    JSON lines file at log_path, along with the board's dimensions and number of 
+    wrigglers so the best configuration per board family can be found later.
+
+    As in solve_puzzle, the SolutionCache at cache_path (if given) is checked before 
+    any search runs, and the winner's solution is cached, though only if it is 
+    guaranteed to be optimal. If telemetry_path is given, every racing search 
+    appends its telemetry snapshots to it, and every search is run with the given 
+    pruning_options.
+    """
+    # The puzzle is decoded here too, to check the cache and write the winner's solution file
+    puzzle_decoder = Decoder(puzzle_path)
+    puzzle = puzzle_decoder.get_puzzle()
+
+    if cache_path:
+        solution_cache = SolutionCache(cache_path)
+        cache_key = SolutionCache.get_puzzle_key(puzzle, puzzle_decoder.get_initial_state())
+        cache_entry = solution_cache.get(cache_key, puzzle)
+
+        if cache_entry:
+            # Skip the race
+            actions, final_state, stats = cache_entry
+            print('Found a cached solution, first found by %s with %s in %.3fs.' % 
+                (stats['algorithm'], stats['heuristic'], stats['wall_time']))
+
+            puzzle.write_solution_file(soln_path, puzzle_path, actions, final_state, stats['wall_time'])
+            return
+
+    if optimality == 'optimal':
+        configs = [config for config in configs if is_optimal_config(*config)]
+    
+    if not configs:
+        print('No configuration meets the \'%s\' optimality requirement' % optimality)
+        return
+    
+    print('Racing %d configurations:' % len(configs))
+
+    for algorithm, heuristic in configs:
+        print('  %s with %s' % (algorithm, heuristic.name))
+    
+    result_queue = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=solve_with_config, 
+        args=(puzzle_path, algorithm, heuristic, config_index, result_queue, telemetry_path, pruning_options)) 
+        for config_index, (algorithm, heuristic) in enumerate(configs)]
+    
+    timer = Timer()
+    timer.start()
+    deadline = time.monotonic() + timeout
+
+    for process in processes:
+        process.start()
+    
+    winner_index = None
+    num_finished = 0
+
+    try:
+        while num_finished < len(processes) and time.monotonic() < deadline:
+            try:
+                config_index, result = result_queue.get(timeout=min(0.1, max(0, deadline - time.monotonic())))
+            
+            except Empty:
+                # Stop waiting if every process has exited without reporting a result
+                if not any(process.is_alive() for process in processes) and result_queue.empty():
+                    break
+
+                continue
+            
+            num_finished += 1
+
+            if result.solution:
+                winner_index = config_index
+                break
+    
+    finally:
+        # Cancel the rest of the race
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            
+            process.join()
+    
+    elapsed_time = timer.end()
+
+    if winner_index is None:
+        print('\nNo configuration found a solution.\n')
+        return
+    
+    algorithm, heuristic = configs[winner_index]
+    print('\n%s with %s won in %.3fs' % (algorithm, heuristic.name, elapsed_time))
+
+    puzzle.write_solution_file(soln_path, puzzle_path, result.solution.actions, result.solution.final_state, elapsed_time)
+
+    # Solutions from configurations that may not be optimal are not cached, as solve_puzzle 
+    #  trusts cached solutions to be shortest
+    if cache_path and is_optimal_config(algorithm, heuristic):
+        num_expanded_nodes = getattr(result, 'num_expanded_nodes', None)
+        max_depth = getattr(result, 'max_depth', None)
+        b_star = get_b_star(num_expanded_nodes, max_depth) if num_expanded_nodes and max_depth else None
+
+        solution_cache.put(cache_key, result.solution.actions, result.solution.final_state, 
+            {'algorithm': algorithm, 'heuristic': heuristic.name, 'wall_time': elapsed_time, 
+            'num_expanded_nodes': num_expanded_nodes, 'max_depth': max_depth, 'b_star': b_star})
+
+    # Record the winner
+    record = {'puzzle_path': puzzle_path, 'width': puzzle.width, 'height': puzzle.height, 
+        'num_wrigglers': puzzle.num_wrigglers, 'optimality': optimality, 'algorithm': algorithm, 
+        'heuristic': heuristic.name, 'wall_time': elapsed_time, 'solution_length': len(result.solution.actions),
+        'configs': ['%s:%s' % (config_algorithm, config_heuristic.name) for config_algorithm, config_heuristic in configs]}
+    
+    with open(log_path, 'a') as log_file:
+        log_file.write(json.dumps(record) + '\n')
+
+
+def get_puzzle_paths(batch_path):
+    """Returns a sorted list of the puzzle files in the batch_path directory, or 
+    matching the batch_path glob pattern.
+    """
+    if os.path.isdir(batch_path):
+        batch_path = os.path.join(batch_path, 'puzzle*.txt')
+    
+    return sorted([path for path in glob.glob(batch_path) if os.path.isfile(path)])
+
+
+def get_soln_path(puzzle_path):
+    """Returns the solution file path for the given puzzle file path: 
+    puzzle<name>.txt is solved to solution<name>.txt in the same directory,
+    and any other <name>.txt to <name>_solution.txt.
+    """
+    directory, file_name = os.path.split(puzzle_path)
+    stem = os.path.splitext(file_name)[0]
+
+    if stem.startswith('puzzle'):
+        soln_name = 'solution' + stem[len('puzzle'):] + '.txt'
+    
+    else:
+        soln_name = stem + '_solution.txt'
+    
+    return os.path.join(directory, soln_name)
+
+
+def run_batch(batch_path, num_workers, timeout, cache_path, telemetry_path, external_memory_limit, work_dir, 
+        pruning_options=None):
+    """Solves every puzzle found by get_puzzle_paths(batch_path) across num_workers 
+    processes, reporting each puzzle as it finishes and printing a summary table 
+    at the end.
+
+    Puzzles whose worker raised or died are reported with an 'error' status. A worker 
+    dying breaks the process pool, so the puzzles still pending then fail the same way.
+    """
+    puzzle_paths = get_puzzle_paths(batch_path)
+
+    if not puzzle_paths:
+        print('No puzzle files found for \'%s\'' % batch_path)
+        return
+    
+    print('Solving %d puzzles with %d workers...\n' % (len(puzzle_paths), num_workers))
+
+    summaries = []
+
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        # Maps each future to the path of the puzzle it solves
+        futures = {executor.submit(solve_puzzle_in_worker, puzzle_path, get_soln_path(puzzle_path), timeout, 
+            cache_path, telemetry_path, external_memory_limit, work_dir, pruning_options): puzzle_path 
+            for puzzle_path in puzzle_paths}
         
+        # Report each puzzle as soon as its solution file has been written
+        for finished_count, future in enumerate(as_completed(futures), 1):
+            try:
+                summary = future.result()
+            
+            except Exception as error:
+                # The worker process died (the pool is then broken) or the summary 
+                #  could not be returned
+                summary = {'puzzle_path': futures[future], 'status': 'error', 'wall_time': None, 
+                    'num_expanded_nodes': None, 'solution_length': None, 'b_star': None, 
+                    'error': '%s: %s' % (type(error).__name__, error)}
+            
+            summaries.append(summary)
+
+            if summary['status'] in ('solved', 'cached'):
+                print('[%d/%d] %s %s in %.3fs, solution written to %s' % (finished_count, len(futures), 
+                    summary['puzzle_path'], summary['status'], summary['wall_time'], get_soln_path(summary['puzzle_path'])))
+            
+            elif summary['status'] == 'error':
+                print('[%d/%d] %s error (%s)' % (finished_count, len(futures), summary['puzzle_path'], summary['error']))
+            
+            else:
+                print('[%d/%d] %s %s' % (finished_count, len(futures), summary['puzzle_path'], summary['status']))
+    
+    print_summary_table(sorted(summaries, key=lambda summary: summary['puzzle_path']))
+
+
+def print_summary_table(summaries):
+    """Prints a table of the given batch summaries."""
+    def format_value(value, format_str):
+        return '-' if value is None else format_str % value
+
+    header = '%-30s %-8s %12s %15s %8s %9s' % ('Puzzle', 'Status', 'Wall time (s)', 'Expanded nodes', 'Length', 'b*')
+    print('\n' + header)
+    print('-' * len(header))
+
+    for summary in summaries:
+        print('%-30s %-8s %12s %15s %8s %9s' % (summary['puzzle_path'], summary['status'], 
+            format_value(summary['wall_time'], '%.3f'), format_value(summary['num_expanded_nodes'], '%d'),
+            format_value(summary['solution_length'], '%d'), format_value(summary['b_star'], '%.5f')))
+    
+    num_solved = len([summary for summary in summaries if summary['status'] in ('solved', 'cached')])
+    total_time = sum([summary['wall_time'] or 0 for summary in summaries])
+    print('\nSolved %d of %d puzzles, %.3fs of total search time' % (num_solved, len(summaries), total_time))
+
+
+if __name__ == '__main__':
+    # Process command line arguments
+    parser = argparse.ArgumentParser(description='Solves TJ-Wriggle puzzles.')
+    parser.add_argument('puzzle_path', nargs='?', default=DEFAULT_PUZZLE_PATH, help='Puzzle file path')
+    parser.add_argument('soln_path', nargs='?', default=DEFAULT_SOLN_PATH, help='Solution file path')
+    parser.add_argument('--batch', metavar='PATH', 
+        help='Solve every puzzle*.txt in a directory, or every file matching a glob, in parallel')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), 
+        help='Number of worker processes in batch mode (default: number of cores)')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, 
+        help='Time limit per puzzle in batch or portfolio mode, in seconds (default: %d)' % DEFAULT_TIMEOUT)
+    parser.add_argument('--portfolio', action='store_true', 
+        help='Race several search configurations on the puzzle, one process each')
+    parser.add_argument('--configs', type=parse_configs, default=PORTFOLIO, 
+        help='Comma separated algorithm:HEURISTIC configurations to race (default: %s)' % 
+        ','.join(['%s:%s' % (algorithm, heuristic.name) for algorithm, heuristic in PORTFOLIO]))
+    parser.add_argument('--optimality', choices=OPTIMALITY_REQUIREMENTS, default='optimal', 
+        help='Solutions the portfolio race accepts (default: optimal)')
+    parser.add_argument('--portfolio-log', default=DEFAULT_PORTFOLIO_LOG_PATH, 
+        help='JSON lines file portfolio winners are appended to (default: %s)' % DEFAULT_PORTFOLIO_LOG_PATH)
+    parser.add_argument('--cache', metavar='PATH', default=DEFAULT_CACHE_PATH, 
+        help='Solution cache checked before searching and updated after, created in the current directory '
+        'unless a path is given (default: %s)' % DEFAULT_CACHE_PATH)
+    parser.add_argument('--no-cache', dest='cache', action='store_const', const=None, 
+        help='Neither read nor write the solution cache')
+    parser.add_argument('--telemetry', metavar='PATH', 
+        help='Append search telemetry snapshots to this JSON lines file')
+    parser.add_argument('--external-memory', action='store_true', 
+        help='Search with an external-memory BFS that keeps its layers on disk, for puzzles too large for memory')
+    parser.add_argument('--memory-limit', type=int, default=DEFAULT_EXTERNAL_MEMORY_LIMIT // 2 ** 20, 
+        help='Megabytes of states the external-memory BFS buffers before sorting them to disk (default: %d)' % 
+        (DEFAULT_EXTERNAL_MEMORY_LIMIT // 2 ** 20))
+    parser.add_argument('--work-dir', metavar='PATH', 
+        help='Directory the external-memory BFS stores its layers in (default: system temporary directory)')
+    parser.add_argument('--por', action='store_true', 
+        help='Skip redundant orderings of independent moves in tree searches (BFTS, ID-DFTS)')
+    parser.add_argument('--prune-inverse', action='store_true', 
+        help='Skip moves undoing the move just made in tree searches (BFTS, ID-DFTS)')
+    parser.add_argument('--check-cycles', action='store_true', 
+        help='Skip moves back to a state on the current path in tree searches (BFTS, ID-DFTS)')
+    args = parser.parse_args()
+
+    if args.portfolio and args.external_memory:
+        parser.error('--external-memory cannot be combined with --portfolio')
+
+    external_memory_limit = args.memory_limit * 2 ** 20 if args.external_memory else None
+    pruning_options = {'partial_order_reduction': args.por, 'prune_inverse_moves': args.prune_inverse, 
+        'check_cycles': args.check_cycles}
+
+    if args.batch:
+        run_batch(args.batch, args.workers, args.timeout, args.cache, args.telemetry, external_memory_limit, 
+            args.work_dir, pruning_options)
+    
+    elif args.portfolio:
+        # Check to see if the puzzle path exists before starting the racing processes
+        if not os.path.isfile(args.puzzle_path):
+            print('Invalid puzzle path \'%s\'' % args.puzzle_path)
+            sys.exit(1)
+
+        race_portfolio(args.puzzle_path, args.soln_path, args.configs, args.optimality, args.timeout, 
+            args.portfolio_log, args.cache, args.telemetry, pruning_options)
+    
     else:
-        print('\nCould not find a solution.\n')
+        puzzle_path = args.puzzle_path
+
+        # Check to see if the puzzle path exists
+        if not os.path.isfile(puzzle_path):
+            # This path is invalid
+            print('Invalid puzzle path \'%s\'' % puzzle_path)
+                
+            # Replace this puzzle path with a default puzzle path
+            puzzle_path = DEFAULT_PUZZLE_PATH
+            
+        # Inform the user which puzzle is being solved
+        print('Solving', puzzle_path + '...')
+
+        solve_puzzle(puzzle_path, args.soln_path, args.cache, args.telemetry, external_memory_limit, args.work_dir, 
+            pruning_options)
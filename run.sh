@@ -1,6 +1,4 @@
 #!/bin/bash
 
-for puzzle in puzzle*.txt; do
-	solution="solution"$(echo $puzzle | tr -dc "0-9")".txt"
-	python3 main.py $puzzle $solution
-done
\ No newline at end of file
+# Solve every puzzle*.txt in parallel, writing solution<N>.txt for each puzzle<N>.txt
+python3 main.py --batch 'puzzle*.txt'
@@ -2,9 +2,12 @@ from tj_wriggle.end import WrigglerEnd
 
 
 class Action:
-    def __init__(self, move_to_coord, wriggler_index, wriggler_end):
+    __slots__ = ('move_to_cell', 'wriggler_index', 'wriggler_end')
+
+
+    def __init__(self, move_to_cell, wriggler_index, wriggler_end):
         """Initializes the Action class."""
-        self.move_to_coord = move_to_coord
+        self.move_to_cell = move_to_cell
         self.wriggler_index = wriggler_index
         self.wriggler_end = wriggler_end
     
@@ -14,4 +17,4 @@ class Action:
         end_str = 'head' if self.wriggler_end == WrigglerEnd.HEAD else 'tail'
 
         return 'Move ' + str(self.wriggler_index) + '\'s ' + end_str + \
-            ' to coordinate ' + str(self.move_to_coord)
+            ' to cell ' + str(self.move_to_cell)
@@ -0,0 +1,51 @@
+class Bitboard:
+    def __init__(self, wall_cells, neighbour_cells):
+        """Initializes the Bitboard class, which stores the static parts of a 
+        TJ-Wriggle puzzle grid as int bit masks, where bit n represents cell n.
+        
+        Where neighbour_cells holds, for each cell, the non-wall cells adjacent to it.
+        Python ints have arbitrary precision, so a single mask covers boards of
+        any size and move generation only touches the bits of the cells involved.
+        """
+        self.wall_mask = self.get_mask(wall_cells)
+        
+        # Masks of the non-wall cells adjacent to each cell
+        self.neighbour_masks = [self.get_mask(adj_cells) for adj_cells in neighbour_cells]
+    
+    
+    @staticmethod
+    def get_mask(cells):
+        """Returns a mask with the bits of the given cells set."""
+        mask = 0
+
+        for cell in cells:
+            mask |= 1 << cell
+        
+        return mask
+    
+    
+    @staticmethod
+    def get_cells(mask):
+        """Returns a list of the cells whose bits are set in the given mask,
+        in ascending order.
+        """
+        cells = []
+
+        while mask:
+            # Isolate and clear the lowest set bit
+            low_bit = mask & -mask
+            cells.append(low_bit.bit_length() - 1)
+            mask ^= low_bit
+        
+        return cells
+    
+    
+    def get_move_mask(self, cell, occupancy):
+        """Returns a mask of the empty cells adjacent to the given cell, where 
+        occupancy is a state's wriggler occupancy mask.
+        """
+        neighbour_mask = self.neighbour_masks[cell]
+
+        # Walls are already excluded from the neighbour mask, so clearing the 
+        #  occupied bits leaves the cells that can be moved to
+        return neighbour_mask ^ (neighbour_mask & occupancy)
@@ -1,4 +1,7 @@
 class Coordinate:
+    __slots__ = ('x', 'y', 'hash_value')
+
+
     def __init__(self, x, y):
         """Initializes the Coordinate class.
         
@@ -8,6 +11,7 @@ class Coordinate:
         """
         self.x = x
         self.y = y
+        self.hash_value = (x + 1) * 100000 + y
 
 
     def __str__(self):
@@ -16,8 +20,10 @@ class Coordinate:
 
 
     def __eq__(self, other):
-        """Returns True if the x & y member variables are equal, False otherwise."""
-        return self.x == other.x and self.y == other.y
+        """Returns True if the x & y member variables are equal, False otherwise.
+        Interned coordinates (see Puzzle.coords) compare by identity.
+        """
+        return self is other or (self.x == other.x and self.y == other.y)
 
 
     def __ne__(self, other):
@@ -46,5 +52,5 @@ class Coordinate:
 
 
     def __hash__(self):
-        """Returns a hash representation of a coordinate."""
-        return (self.x + 1) * 100000 + self.y
+        """Returns a hash representation of a coordinate, precomputed on initialization."""
+        return self.hash_value
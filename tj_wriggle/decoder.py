@@ -1,9 +1,5 @@
 from tj_wriggle.chars import Chars
-from tj_wriggle.coordinate import Coordinate
-from tj_wriggle.directions import Directions
 from tj_wriggle.puzzle import Puzzle
-from tj_wriggle.state import State
-from tj_wriggle.wriggler import Wriggler
 import sys
 
 
@@ -30,73 +26,76 @@ class Decoder:
             found in self.puzzle.
             """
             
-            def find_body_coords(coord, body_coords):
-                """Recursively finds the body coordinates associated with given coordinate coord, 
-                which could be a head coordinate or a body coordinate.
+            def find_body_cells(cell, body_cells):
+                """Recursively finds the body cells associated with given cell, 
+                which could be a head cell or a body cell.
                 """
+                coord = coords[cell]
                 value_at_coord = self.puzzle[coord.x][coord.y]
                 
-                # Initialize new_coord in case of error
-                new_coord = None
+                # Initialize new_cell in case of error
+                new_cell = None
                 
                 if value_at_coord in [str(wriggler_index) for wriggler_index in range(self.num_wrigglers)]:
-                    # The tail coordinate has been found
+                    # The tail cell has been found
                     return
 
                 elif value_at_coord == Chars.HEAD_UP.value    or \
                     value_at_coord == Chars.UP.value:
-                    new_coord = Coordinate(coord.x - 1, coord.y)
+                    new_cell = cell - self.width
                 
                 elif value_at_coord == Chars.HEAD_DOWN.value  or \
                     value_at_coord == Chars.DOWN.value:
-                    new_coord = Coordinate(coord.x + 1, coord.y)
+                    new_cell = cell + self.width
                     
                 elif value_at_coord == Chars.HEAD_LEFT.value  or \
                     value_at_coord == Chars.LEFT.value:
-                    new_coord = Coordinate(coord.x, coord.y - 1)
+                    new_cell = cell - 1
 
                 elif value_at_coord == Chars.HEAD_RIGHT.value or \
                     value_at_coord == Chars.RIGHT.value:
-                    new_coord = Coordinate(coord.x, coord.y + 1)
+                    new_cell = cell + 1
 
-                body_coords.append(new_coord)
-                return find_body_coords(new_coord, body_coords)
+                body_cells.append(new_cell)
+                return find_body_cells(new_cell, body_cells)
                 
 
-            tail_coords = set([])
-            head_coords = set([])
-
-            # Find all head and tail coordinates in the puzzle
-            for x in range(self.height):
-                for y in range(self.width):
-                    if self.puzzle[x][y] in [str(wriggler_index) for wriggler_index in range(self.num_wrigglers)]:
-                        # There is a tail at this coordinate
-                        tail_coords.add(Coordinate(x, y))
-
-                    elif self.puzzle[x][y] in [
-                            Chars.HEAD_UP.value,
-                            Chars.HEAD_DOWN.value,
-                            Chars.HEAD_LEFT.value,
-                            Chars.HEAD_RIGHT.value
-                        ]:
-                        # There is a head at this coordinate
-                        head_coords.add(Coordinate(x, y))
+            # Interned coordinates of every cell, shared with the decoded puzzle
+            coords = self.tj_puzzle.coords
+
+            tail_cells = set([])
+            head_cells = set([])
+
+            # Find all head and tail cells in the puzzle
+            for cell, coord in enumerate(coords):
+                if self.puzzle[coord.x][coord.y] in [str(wriggler_index) for wriggler_index in range(self.num_wrigglers)]:
+                    # There is a tail at this cell
+                    tail_cells.add(cell)
+
+                elif self.puzzle[coord.x][coord.y] in [
+                        Chars.HEAD_UP.value,
+                        Chars.HEAD_DOWN.value,
+                        Chars.HEAD_LEFT.value,
+                        Chars.HEAD_RIGHT.value
+                    ]:
+                    # There is a head at this cell
+                    head_cells.add(cell)
 
             # Sanity check
-            assert(len(tail_coords) == len(head_coords) == self.num_wrigglers)
+            assert(len(tail_cells) == len(head_cells) == self.num_wrigglers)
 
             # Initialize wriggler list
             wrigglers = [None for _ in range(self.num_wrigglers)] 
             
             # From each head, find all segments that make up the body
-            for head_coord in head_coords:
-                body_coords = []
-                find_body_coords(head_coord, body_coords)
-                tail_coord = body_coords[-1]
+            for head_cell in head_cells:
+                body_cells = [head_cell]
+                find_body_cells(head_cell, body_cells)
+                tail_coord = coords[body_cells[-1]]
                 wriggler_index = int(self.puzzle[tail_coord.x][tail_coord.y])
 
-                # Instantiate each wriggler with their body coordinates
-                wrigglers[wriggler_index] = Wriggler([head_coord] + body_coords)
+                # Instantiate each wriggler with their body cells
+                wrigglers[wriggler_index] = self.tj_puzzle.get_wriggler(tuple(body_cells))
             
             return wrigglers
 
@@ -142,26 +141,26 @@ class Decoder:
                 print('Error: Puzzle file is not in the correct format.\n')
                 sys.exit()
 
-        # Store all wall coordinates and empty coordinates
-        self.wall_coords = set([])
-        self.empty_coords = set([])
+        # Store all wall cells
+        # Empty cells are not stored, they are derived from each state's occupancy mask
+        wall_cells = set([])
 
         for x in range(self.height):
             for y in range(self.width):
                 if self.puzzle[x][y] == Chars.WALL.value:
-                    self.wall_coords.add(Coordinate(x, y))
-                
-                elif self.puzzle[x][y] == Chars.EMPTY.value:
-                    self.empty_coords.add(Coordinate(x, y))
+                    wall_cells.add(x * self.width + y)
+        
+        # Build the puzzle, along with its cell tables, once at decode time
+        self.tj_puzzle = Puzzle(self.width, self.height, self.num_wrigglers, frozenset(wall_cells))
         
         self.wrigglers = get_wrigglers()
 
     
     def get_initial_state(self):
         """Returns the initial state of the TJ-Wriggle puzzle."""
-        return State(self.wrigglers, self.empty_coords)
+        return self.tj_puzzle.get_state(tuple(self.wrigglers))
         
     
     def get_puzzle(self):
         """Returns the TJ-Wriggle puzzle data."""
-        return Puzzle(self.width, self.height, self.num_wrigglers, self.wall_coords)
+        return self.tj_puzzle
@@ -0,0 +1,57 @@
+import numpy
+
+
+class DistanceMap:
+    # Distance lists already computed by this process, keyed by wall layout
+    # Batch runs over many puzzles sharing a layout compute each map only once
+    cache = {}
+
+
+    @classmethod
+    def get_distances(cls, width, height, wall_cells, target_cell):
+        """Returns a list holding, for every cell, the length of the shortest 
+        path over non-wall cells from that cell to target_cell. Cells with no 
+        such path (including walls) hold infinity.
+        """
+        key = (width, height, wall_cells, target_cell)
+
+        if key not in cls.cache:
+            cls.cache[key] = cls.compute_distances(width, height, wall_cells, target_cell)
+        
+        return cls.cache[key]
+
+
+    @staticmethod
+    def compute_distances(width, height, wall_cells, target_cell):
+        """Returns the distance list described in get_distances, computed by 
+        propagating a breadth-first wavefront over the whole grid with NumPy.
+        """
+        is_open = numpy.ones(width * height, dtype=bool)
+        is_open[list(wall_cells)] = False
+        is_open = is_open.reshape(height, width)
+
+        distances = numpy.full((height, width), -1, dtype=numpy.int64)
+        wavefront = numpy.zeros((height, width), dtype=bool)
+        target_x, target_y = divmod(target_cell, width)
+
+        if is_open[target_x, target_y]:
+            wavefront[target_x, target_y] = True
+            distances[target_x, target_y] = 0
+        
+        distance = 0
+
+        while wavefront.any():
+            distance += 1
+
+            # Spread the wavefront one step up, down, left and right
+            spread = numpy.zeros_like(wavefront)
+            spread[:-1, :] |= wavefront[1:, :]
+            spread[1:, :]  |= wavefront[:-1, :]
+            spread[:, :-1] |= wavefront[:, 1:]
+            spread[:, 1:]  |= wavefront[:, :-1]
+            
+            # Keep only open cells that haven't been reached yet
+            wavefront = spread & is_open & (distances < 0)
+            distances[wavefront] = distance
+        
+        return [int(d) if d >= 0 else float('inf') for d in distances.ravel().tolist()]
@@ -0,0 +1,257 @@
+from tj_wriggle.action import Action
+from tj_wriggle.end import WrigglerEnd
+from tj_wriggle.puzzle import Puzzle
+import random
+
+
+# Constants
+# Random walks tried when laying a wriggler's body before the layout is abandoned
+MAX_PLACEMENT_ATTEMPTS = 100
+
+# Layouts tried before generation gives up on the given parameters
+MAX_LAYOUT_ATTEMPTS = 20
+
+# Share of scramble moves drawn for the 0th wriggler, so that it is driven away from
+#  the goal rather than only buried in place
+GOAL_WRIGGLER_SHARE = 0.5
+
+# Random wriggler ends drawn for a scramble move before every action is considered
+MAX_END_DRAWS = 32
+
+WRIGGLER_ENDS = (WrigglerEnd.HEAD, WrigglerEnd.TAIL)
+
+
+class Generator:
+    def __init__(self, width, height, wall_density, num_wrigglers, wriggler_length, seed=None):
+        """Initializes the Generator class, which builds random, solvable TJ-Wriggle
+        puzzles.
+
+        Where wall_density is the fraction of cells to fill with walls, and every
+        wriggler has wriggler_length (at least 2) body segments. Puzzles are built
+        backwards: the wrigglers are laid out in a goal state, then scrambled with
+        random moves. Every move can be undone, so the scramble can always be
+        retraced to the goal. The same seed always gives the same puzzles.
+        """
+        assert wriggler_length >= 2, 'Wrigglers need a head and a tail'
+        assert 0 <= wall_density < 1, 'Wall density must be in [0, 1)'
+
+        self.width = width
+        self.height = height
+        self.wall_density = wall_density
+        self.num_wrigglers = num_wrigglers
+        self.wriggler_length = wriggler_length
+        self.random = random.Random(seed)
+
+
+    def generate(self, target_depth):
+        """Returns a (puzzle, initial_state) pair whose initial state is target_depth
+        random moves away from a goal state.
+
+        The scramble length is an upper bound on the optimal solution length: walks
+        that return to states already visited are avoided, but the scramble can still
+        stumble onto shortcuts. Raises ValueError if the wrigglers do not fit the board
+        or every scramble ends in a goal state.
+        """
+        for _ in range(MAX_LAYOUT_ATTEMPTS):
+            puzzle = Puzzle(self.width, self.height, self.num_wrigglers, self.get_wall_cells())
+            goal_state = self.get_goal_state(puzzle)
+
+            if goal_state is None:
+                continue
+
+            initial_state = self.scramble(puzzle, goal_state, target_depth)
+
+            if not puzzle.check_goal_state(initial_state):
+                return puzzle, initial_state
+
+        raise ValueError('Could not generate a %dx%d puzzle with %d wrigglers of length %d' %
+            (self.width, self.height, self.num_wrigglers, self.wriggler_length))
+
+
+    def get_wall_cells(self):
+        """Returns a frozenset of randomly placed wall cells covering roughly
+        wall_density of the board.
+
+        The goal cell is always left open, and open cells cut off from it are walled
+        in, so every open cell can be reached from the goal.
+        """
+        num_cells = self.width * self.height
+        goal_cell = num_cells - 1
+
+        # Walls are drawn from every cell but the goal
+        wall_cells = set(self.random.sample(range(goal_cell), int(self.wall_density * num_cells)))
+
+        # Flood fill the open cells reachable from the goal
+        reachable_cells = {goal_cell}
+        stack = [goal_cell]
+
+        while stack:
+            cell = stack.pop()
+            x, y = divmod(cell, self.width)
+
+            for adj_cell, in_bounds in ((cell - self.width, x > 0), (cell + self.width, x < self.height - 1),
+                    (cell - 1, y > 0), (cell + 1, y < self.width - 1)):
+                if in_bounds and adj_cell not in wall_cells and adj_cell not in reachable_cells:
+                    reachable_cells.add(adj_cell)
+                    stack.append(adj_cell)
+
+        return frozenset([cell for cell in range(num_cells) if cell not in reachable_cells])
+
+
+    def get_goal_state(self, puzzle):
+        """Returns a random goal state of the given puzzle: the 0th wriggler has one
+        end on the goal cell, and the rest are laid along random self-avoiding paths.
+
+        Returns None if some wriggler could not be fitted onto the board.
+        """
+        occupied_cells = set([])
+        wrigglers = []
+
+        for wriggler_index in range(self.num_wrigglers):
+            for _ in range(MAX_PLACEMENT_ATTEMPTS):
+                if wriggler_index == 0:
+                    start_cell = puzzle.goal_cell
+
+                else:
+                    start_cell = self.random.randrange(self.width * self.height)
+
+                    if start_cell in puzzle.wall_cells or start_cell in occupied_cells:
+                        continue
+
+                body_cells = self.get_body_cells(puzzle, start_cell, occupied_cells)
+
+                if body_cells is not None:
+                    break
+
+            else:
+                return None
+
+            # The start cell is the head or the tail, whichever the coin says
+            if self.random.random() < 0.5:
+                body_cells.reverse()
+
+            occupied_cells.update(body_cells)
+            wrigglers.append(puzzle.get_wriggler(tuple(body_cells)))
+
+        return puzzle.get_state(tuple(wrigglers))
+
+
+    def get_body_cells(self, puzzle, start_cell, occupied_cells):
+        """Returns a list of wriggler_length cells making up a random self-avoiding
+        walk over open cells from start_cell, or None if the walk gets stuck.
+        """
+        body_cells = [start_cell]
+        body_cell_set = {start_cell}
+
+        while len(body_cells) < self.wriggler_length:
+            adj_cells = [adj_cell for adj_cell in puzzle.neighbour_cells[body_cells[-1]]
+                if adj_cell not in occupied_cells and adj_cell not in body_cell_set]
+
+            if not adj_cells:
+                return None
+
+            adj_cell = self.random.choice(adj_cells)
+            body_cells.append(adj_cell)
+            body_cell_set.add(adj_cell)
+
+        return body_cells
+
+
+    def scramble(self, puzzle, state, num_moves):
+        """Returns the state reached from the given state by num_moves random moves,
+        or fewer if every wriggler becomes jammed.
+
+        Moves into states the walk has already visited are only made when there is
+        no other choice.
+        """
+        visited = {state.hash_value}
+
+        for _ in range(num_moves):
+            new_state = self.get_random_result(puzzle, state, visited)
+
+            if new_state is None:
+                break
+
+            state = new_state
+            visited.add(state.hash_value)
+
+        return state
+
+
+    def get_random_result(self, puzzle, state, visited):
+        """Returns the result of a random move from the given state, avoiding the
+        states in visited where possible, or None if no wriggler can move.
+
+        Generating every action of a large board is slow, so wriggler ends are drawn
+        at random and only their moves are generated. The 0th wriggler is drawn
+        GOAL_WRIGGLER_SHARE of the time, the rest uniformly, and it moves its end
+        furthest from the goal as far from the goal as it can.
+        """
+        bitboard = puzzle.bitboard
+
+        for _ in range(MAX_END_DRAWS):
+            if self.random.random() < GOAL_WRIGGLER_SHARE:
+                wriggler_index = 0
+
+            else:
+                wriggler_index = self.random.randrange(self.num_wrigglers)
+
+            wriggler = state.wriggler_list[wriggler_index]
+            wriggler_end = self.random.choice(WRIGGLER_ENDS)
+
+            if wriggler_index == 0:
+                # Moving the end nearer the goal would pull the other end back towards it,
+                #  so the 0th wriggler leads with the end further away
+                if puzzle.goal_distances[wriggler.get_head()] > puzzle.goal_distances[wriggler.get_tail()]:
+                    wriggler_end = WrigglerEnd.HEAD
+
+                elif puzzle.goal_distances[wriggler.get_head()] < puzzle.goal_distances[wriggler.get_tail()]:
+                    wriggler_end = WrigglerEnd.TAIL
+
+            move_from_cell = wriggler.get_head() if wriggler_end == WrigglerEnd.HEAD else wriggler.get_tail()
+
+            move_cells = bitboard.get_cells(bitboard.get_move_mask(move_from_cell, state.occupancy))
+            self.random.shuffle(move_cells)
+
+            if wriggler_index == 0:
+                # Lead the 0th wriggler away from the goal, ties broken by the shuffle
+                move_cells.sort(key=lambda cell: puzzle.goal_distances[cell], reverse=True)
+
+            for move_to_cell in move_cells:
+                new_state = puzzle.get_result(state, Action(move_to_cell, wriggler_index, wriggler_end))
+
+                if new_state.hash_value not in visited:
+                    return new_state
+
+        # Every draw was jammed or led back to a visited state, so fall back to
+        #  considering every action
+        actions = puzzle.get_actions(state)
+
+        if not actions:
+            return None
+
+        self.random.shuffle(actions)
+
+        # Take the first move to an unvisited state, or failing that any move
+        for action in actions:
+            new_state = puzzle.get_result(state, action)
+
+            if new_state.hash_value not in visited:
+                break
+
+        return new_state
+
+
+    @staticmethod
+    def encode(puzzle, state):
+        """Returns the given puzzle and state as the contents of a puzzle file in the
+        format read by Decoder.
+        """
+        return '%d %d %d\n%s\n' % (puzzle.width, puzzle.height, puzzle.num_wrigglers, puzzle.visualize(state))
+
+
+    @staticmethod
+    def write_puzzle_file(puzzle_path, puzzle, state):
+        """Writes the given puzzle and state to a puzzle file at puzzle_path."""
+        with open(puzzle_path, 'w') as puzzle_file:
+            puzzle_file.write(Generator.encode(puzzle, state))
@@ -1,20 +1,128 @@
 from tj_wriggle.action import Action
+from tj_wriggle.bitboard import Bitboard
 from tj_wriggle.chars import Chars
 from tj_wriggle.coordinate import Coordinate
 from tj_wriggle.directions import Directions
+from tj_wriggle.distance_map import DistanceMap
 from tj_wriggle.end import WrigglerEnd
 from tj_wriggle.state import State
+from tj_wriggle.summed_area_table import SummedAreaTable
 from tj_wriggle.wriggler import Wriggler
+from tj_wriggle.zobrist import Zobrist
 
 
 class Puzzle:
-    def __init__(self, width, height, num_wrigglers, wall_coords):
-        """Initializes the TJ-Wriggle Puzzle class."""
+    def __init__(self, width, height, num_wrigglers, wall_cells):
+        """Initializes the TJ-Wriggle Puzzle class.
+        
+        Board squares are identified by integer cell IDs in row-major order 
+        (see get_cell), where wall_cells is the set of cell IDs containing walls.
+        """
         self.width = width
         self.height = height
         self.num_wrigglers = num_wrigglers
-        self.wall_coords = wall_coords
-        self.goal_coord = Coordinate(self.height - 1, self.width - 1)
+        self.wall_cells = wall_cells
+        self.goal_cell = self.get_cell(self.height - 1, self.width - 1)
+
+        # Interned coordinate of every cell, indexed by cell ID
+        # Coordinates are looked up here rather than allocated wherever they are needed
+        self.coords = [Coordinate(x, y) for x in range(self.height) for y in range(self.width)]
+
+        # Static tuple of the non-wall cells adjacent to each cell
+        self.neighbour_cells = [self.get_neighbour_cells(cell) for cell in range(self.width * self.height)]
+        
+        # Wall and neighbour masks used for move generation
+        self.bitboard = Bitboard(wall_cells, self.neighbour_cells)
+
+        # Keys used to fingerprint states
+        self.zobrist = Zobrist(self.width * self.height, self.num_wrigglers)
+
+        # Wall-aware distance from every cell to the goal (infinity where there is no route)
+        self.goal_distances = DistanceMap.get_distances(self.width, self.height, self.wall_cells, self.goal_cell)
+
+        # Cell offset of one step in each direction, indexed by Directions value - 1
+        self.direction_offsets = (-self.width, self.width, -1, 1)
+
+        # Prefix sums of the walls, giving the wall count of any rectangle in O(1)
+        self.wall_table = SummedAreaTable(self.width, self.height, self.wall_cells)
+
+
+    def get_cell(self, x, y):
+        """Returns the integer cell ID of the square x positions down and 
+        y positions right in the puzzle grid.
+        """
+        return x * self.width + y
+
+
+    def get_coord(self, cell):
+        """Returns the interned Coordinate corresponding to the given cell ID."""
+        return self.coords[cell]
+
+
+    def get_neighbour_cells(self, cell):
+        """Returns a tuple of the non-wall cells adjacent to the given cell."""
+        adj_cells = []
+        coord = self.coords[cell]
+
+        if not coord.x == 0:
+            adj_cells.append(cell - self.width)
+
+        if not coord.x == self.height - 1:
+            adj_cells.append(cell + self.width)
+        
+        if not coord.y == 0:
+            adj_cells.append(cell - 1)
+        
+        if not coord.y == self.width - 1:
+            adj_cells.append(cell + 1)
+        
+        return tuple([adj_cell for adj_cell in adj_cells if adj_cell not in self.wall_cells])
+
+
+    def get_goal_rectangle_masks(self):
+        """Returns a list holding, for each cell, a mask of the cells in the rectangle
+        spanned by that cell and the goal cell in the bottom-right corner.
+        """
+        masks = [0] * (self.width * self.height)
+
+        # Each rectangle is its top row joined to the rectangle below it, so the
+        #  rows are built from the bottom up
+        for x in reversed(range(self.height)):
+            for y in range(self.width):
+                cell = self.get_cell(x, y)
+                row_mask = ((1 << (self.width - y)) - 1) << cell
+
+                masks[cell] = row_mask | masks[cell + self.width] if x < self.height - 1 else row_mask
+
+        return masks
+
+
+    def get_wriggler(self, body_cells):
+        """Returns a Wriggler class instance with the given body cells, ordered
+        from head to tail.
+        """
+        return Wriggler(body_cells, self.zobrist.get_body_hash(body_cells))
+
+
+    def get_state(self, wriggler_list):
+        """Returns a State class instance made up of the given tuple of wrigglers,
+        computing its occupancy mask and fingerprint from scratch.
+        """
+        occupancy = 0
+
+        for wriggler in wriggler_list:
+            for cell in wriggler.body_cells:
+                occupancy |= 1 << cell
+        
+        return State(wriggler_list, occupancy, self.zobrist.get_state_hash(wriggler_list))
+
+
+    def get_empty_cells(self, state):
+        """Returns a list of the cell IDs that contain neither a wall nor a 
+        wriggler body segment in the given state.
+        """
+        board_mask = (1 << (self.width * self.height)) - 1
+        return self.bitboard.get_cells(board_mask & ~(self.bitboard.wall_mask | state.occupancy))
         
     
     def get_actions(self, state):
@@ -22,22 +130,22 @@ class Puzzle:
         state.
         """
         actions = []
+        get_move_mask = self.bitboard.get_move_mask
+        occupancy = state.occupancy
 
         # Iterate through all wrigglers in the state
         for wriggler_index, wriggler in enumerate(state.wriggler_list):
-            # Get possible coordinates the wriggler can move from
-            move_from_coords = [wriggler.get_head(), wriggler.get_tail()] 
-            
             # Generate possible actions for both ends of the wriggler
-            for wriggler_end, move_from_coord in enumerate(move_from_coords):
-                # Get valid, empty, adjacent coordinates that can be moved to from
-                #  the move_from_coord                
-                adj_coords = self.get_adj_coords(state, move_from_coord)
+            for wriggler_end, move_from_cell in ((WrigglerEnd.HEAD, wriggler.get_head()), 
+                    (WrigglerEnd.TAIL, wriggler.get_tail())):
+                # Get a mask of the empty cells adjacent to the move_from_cell
+                move_mask = get_move_mask(move_from_cell, occupancy)
 
-                # Add the possible actions that can be made to the actions list
-                for move_to_coord in adj_coords:
-                    actions.append(Action(move_to_coord, wriggler_index, \
-                        WrigglerEnd.HEAD if WrigglerEnd.HEAD.value == wriggler_end else WrigglerEnd.TAIL))
+                # Add an action for each set bit of the move mask
+                while move_mask:
+                    low_bit = move_mask & -move_mask
+                    actions.append(Action(low_bit.bit_length() - 1, wriggler_index, wriggler_end))
+                    move_mask ^= low_bit
         
         return actions
     
@@ -45,38 +153,80 @@ class Puzzle:
     def get_result(self, state, action):
         """Returns the resulting state obtained after applying the
         given action to the given state.
+        
+        The new state shares every unmoved wriggler with the given state, and its 
+        occupancy mask and fingerprint are updated from the two cells that changed, 
+        so the cost is proportional to the length of the moved wriggler.
         """
-        # Copy state contents into new variables
-        new_wriggler_list = []
-        new_empty_coords = set([])
+        zobrist = self.zobrist
+        wriggler_index = action.wriggler_index
+        move_to_cell = action.move_to_cell
+
+        new_wriggler_list = list(state.wriggler_list)
+        wriggler = new_wriggler_list[wriggler_index]
+        body_cells = wriggler.body_cells
+        
+        if action.wriggler_end == WrigglerEnd.HEAD:
+            # The head moves to the new cell and the tail cell is vacated
+            vacated_cell = body_cells[-1]
+            body_hash = zobrist.get_head_move_hash(wriggler.hash_value, len(body_cells), move_to_cell, vacated_cell)
+            body_cells = (move_to_cell,) + body_cells[:-1]
+        
+        else: # action.wriggler_end == WrigglerEnd.TAIL
+            # The tail moves to the new cell and the head cell is vacated
+            vacated_cell = body_cells[0]
+            body_hash = zobrist.get_tail_move_hash(wriggler.hash_value, len(body_cells), move_to_cell, vacated_cell)
+            body_cells = body_cells[1:] + (move_to_cell,)
 
-        for wriggler in state.wriggler_list:
-            new_wriggler_list.append(Wriggler([Coordinate(body_coord.x, body_coord.y) for body_coord in wriggler.body_coords]))
+        new_wriggler_list[wriggler_index] = Wriggler(body_cells, body_hash)
         
-        for empty_coord in state.empty_coords:
-            new_empty_coords.add(Coordinate(empty_coord.x, empty_coord.y))
+        # Only the vacated cell and the moved to cell change occupancy
+        occupancy = state.occupancy ^ (1 << vacated_cell) ^ (1 << move_to_cell)
 
-        # Adjust the empty coordinates to account for the move
-        new_empty_coords.remove(action.move_to_coord)
+        # Swap the moved wriggler's old contribution to the fingerprint for its new one
+        hash_value = state.hash_value ^ zobrist.get_wriggler_term(wriggler_index, wriggler.hash_value) ^ \
+            zobrist.get_wriggler_term(wriggler_index, body_hash)
+        
+        return State(tuple(new_wriggler_list), occupancy, hash_value)
+    
+
+    def encode_action(self, state, action):
+        """Returns a small integer action code packing the given action's wriggler 
+        index, wriggler end and the Directions value of its move, relative to the 
+        state it is applied to.
+        
+        Codes take up 3 bits plus the wriggler index, so paths can be stored compactly
+        and rebuilt with decode_action.
+        """
+        wriggler = state.wriggler_list[action.wriggler_index]
         
         if action.wriggler_end == WrigglerEnd.HEAD:
-            # The coordinate previously occupied by the tail is now empty
-            # Reflect this in the empty coordinate list
-            new_empty_coords.add(new_wriggler_list[action.wriggler_index].get_tail())
-            
-            # Adjust this wriggler's body coordinates
-            new_wriggler_list[action.wriggler_index].body_coords = [action.move_to_coord] + new_wriggler_list[action.wriggler_index].body_coords[:-1]
+            move_from_cell = wriggler.get_head()
         
         else: # action.wriggler_end == WrigglerEnd.TAIL
-            # The coordinate previously occupied by the head is now empty
-            # Reflect this in the empty coordinate list
-            new_empty_coords.add(new_wriggler_list[action.wriggler_index].get_head())
+            move_from_cell = wriggler.get_tail()
+        
+        direction_index = self.direction_offsets.index(action.move_to_cell - move_from_cell)
+
+        return ((action.wriggler_index << 1 | action.wriggler_end.value) << 2) | direction_index
 
-            # Adjust this wriggler's body coordinates
-            new_wriggler_list[action.wriggler_index].body_coords = new_wriggler_list[action.wriggler_index].body_coords[1:] + [action.move_to_coord]
+
+    def decode_action(self, state, action_code):
+        """Returns the Action encoded by the given action code (see encode_action)
+        for the given state.
+        """
+        wriggler_index = action_code >> 3
+        wriggler_end = WrigglerEnd((action_code >> 2) & 1)
+        wriggler = state.wriggler_list[wriggler_index]
         
-        return State(new_wriggler_list, new_empty_coords)
-    
+        if wriggler_end == WrigglerEnd.HEAD:
+            move_from_cell = wriggler.get_head()
+        
+        else: # wriggler_end == WrigglerEnd.TAIL
+            move_from_cell = wriggler.get_tail()
+        
+        return Action(move_from_cell + self.direction_offsets[action_code & 3], wriggler_index, wriggler_end)
+
 
     def check_goal_state(self, state):
         """Returns True if the given state is the goal state,
@@ -85,31 +235,15 @@ class Puzzle:
         A goal state is represented by the 0th wriggler (the blue wriggler) 
         occupying the bottom-right puzzle corner with either its head or tail.
         """
-        return state.wriggler_list[0].get_head() == self.goal_coord or \
-               state.wriggler_list[0].get_tail() == self.goal_coord
+        return state.wriggler_list[0].get_head() == self.goal_cell or \
+               state.wriggler_list[0].get_tail() == self.goal_cell
         
     
-    def get_adj_coords(self, state, coord):
-        """Returns a list of valid, empty coordinates adjacent to the
-        given coordinate c for the given state.
+    def get_adj_cells(self, state, cell):
+        """Returns a list of valid, empty cells adjacent to the
+        given cell for the given state.
         """
-        valid_adj_coords = []
-
-        # Add coordinates that are valid to valid_adj_coords
-        if not coord.x == 0:
-            valid_adj_coords.append(Coordinate(coord.x - 1, coord.y))
-
-        if not coord.x == self.height - 1:
-            valid_adj_coords.append(Coordinate(coord.x + 1, coord.y))
-        
-        if not coord.y == 0:
-            valid_adj_coords.append(Coordinate(coord.x, coord.y - 1))
-        
-        if not coord.y == self.width - 1:
-            valid_adj_coords.append(Coordinate(coord.x, coord.y + 1))
-        
-        # Return coordinates from valid_adj_coords that are empty
-        return [coord for coord in valid_adj_coords if coord in state.empty_coords]
+        return [adj_cell for adj_cell in self.neighbour_cells[cell] if adj_cell not in state]
     
     
     def visualize(self, state):
@@ -122,20 +256,22 @@ class Puzzle:
         puzzle = [[Chars.EMPTY.value for _ in range(self.width)] for _ in range(self.height)]
         
         # Insert walls
-        for c in self.wall_coords:
+        for wall_cell in self.wall_cells:
+            c = self.coords[wall_cell]
             puzzle[c.x][c.y] = Chars.WALL.value
         
         # Insert wrigglers
         for wriggler_index, wriggler in enumerate(state.wriggler_list):
-            tail_coord  = wriggler.get_tail()
+            body_coords = [self.coords[cell] for cell in wriggler.body_cells]
+            tail_coord  = body_coords[-1]
             
             # Set the wriggler's index on the puzzle grid
             puzzle[tail_coord.x][tail_coord.y] = str(wriggler_index)
             
             # Insert wriggler body characters
-            for body_index in range(len(wriggler.body_coords) - 1):
-                this_body_segment = wriggler.body_coords[body_index]
-                next_body_segment = wriggler.body_coords[body_index + 1]
+            for body_index in range(len(body_coords) - 1):
+                this_body_segment = body_coords[body_index]
+                next_body_segment = body_coords[body_index + 1]
                 
                 # Find the direction of the next body segment
                 if this_body_segment.x > next_body_segment.x and this_body_segment.y == next_body_segment.y:
@@ -192,10 +328,11 @@ class Puzzle:
         soln_str = ''
 
         for action in actions:
+            move_to_coord = self.coords[action.move_to_cell]
             soln_str += str(action.wriggler_index) + ' '
             soln_str += ('0' if action.wriggler_end == WrigglerEnd.HEAD else '1') + ' '
-            soln_str += str(action.move_to_coord.y) + ' '
-            soln_str += str(action.move_to_coord.x) + '\n'
+            soln_str += str(move_to_coord.y) + ' '
+            soln_str += str(move_to_coord.x) + '\n'
         
         soln_str += self.visualize(final_state) + '\n'
         soln_str += str(wall_time) + '\n'  
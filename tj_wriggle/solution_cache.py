@@ -0,0 +1,129 @@
+from tj_wriggle.action import Action
+from tj_wriggle.end import WrigglerEnd
+import contextlib
+import hashlib
+import json
+import sqlite3
+import time
+
+
+# Constants
+DEFAULT_CACHE_PATH = 'solution_cache.sqlite3'
+
+# Total size of the cached entries, in bytes, above which the least recently used are evicted
+DEFAULT_MAX_BYTES = 64 * 2 ** 20
+
+# Seconds a process waits for another to release its lock on the cache
+LOCK_TIMEOUT = 60
+
+
+class SolutionCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        """Initializes the SolutionCache class, an on-disk cache of puzzle solutions
+        shared between runs.
+
+        Entries are stored in the SQLite database at path, keyed by the canonical hash
+        of a puzzle (see get_puzzle_key). Each holds the solution's actions, final state
+        and search stats as JSON. When the entries grow past max_bytes the least recently
+        used are evicted. Every operation opens its own connection and transaction, so
+        any number of processes can use the cache at once.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+
+        with self.connect() as connection:
+            # Write-ahead logging lets readers run alongside a writer
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('CREATE TABLE IF NOT EXISTS solutions (key TEXT PRIMARY KEY, actions TEXT, '
+                'final_state TEXT, stats TEXT, size INTEGER, last_used REAL)')
+            connection.execute('CREATE INDEX IF NOT EXISTS solutions_last_used ON solutions (last_used)')
+
+
+    @contextlib.contextmanager
+    def connect(self):
+        """Returns a context manager yielding a new connection to the cache database,
+        which commits (or on error rolls back) its transaction and closes on exit.
+        """
+        connection = sqlite3.connect(self.path, timeout=LOCK_TIMEOUT)
+
+        try:
+            with connection:
+                yield connection
+        
+        finally:
+            connection.close()
+
+
+    @staticmethod
+    def get_puzzle_key(puzzle, initial_state):
+        """Returns the canonical hash of the given puzzle and initial state: a SHA-256
+        hex digest of the board dimensions, the sorted wall cells and the body cells of
+        each wriggler, in wriggler order.
+
+        Puzzle files that decode to the same board share a key, whatever their formatting.
+        """
+        canonical = json.dumps([puzzle.width, puzzle.height, sorted(puzzle.wall_cells),
+            [list(wriggler.body_cells) for wriggler in initial_state.wriggler_list]], separators=(',', ':'))
+
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+    def get(self, key, puzzle):
+        """Returns the (actions, final_state, stats) entry cached under the given key,
+        with the actions and final state rebuilt for the given puzzle, or None if there
+        is no such entry. The entry becomes the most recently used.
+        """
+        with self.connect() as connection:
+            row = connection.execute('SELECT actions, final_state, stats FROM solutions WHERE key = ?', (key,)).fetchone()
+
+            if row is None:
+                return None
+
+            connection.execute('UPDATE solutions SET last_used = ? WHERE key = ?', (time.time(), key))
+
+        actions_json, final_state_json, stats_json = row
+
+        actions = [Action(move_to_cell, wriggler_index, WrigglerEnd(wriggler_end))
+            for wriggler_index, wriggler_end, move_to_cell in json.loads(actions_json)]
+        final_state = puzzle.get_state(tuple([puzzle.get_wriggler(tuple(body_cells))
+            for body_cells in json.loads(final_state_json)]))
+
+        return actions, final_state, json.loads(stats_json)
+
+
+    def put(self, key, actions, final_state, stats):
+        """Caches the given actions, final state and dict of search stats under the
+        given key, replacing any entry already there, then evicts the least recently
+        used other entries while the cache is larger than max_bytes.
+
+        Returns True if the entry was cached, or False if it alone is larger than
+        max_bytes, in which case the cache is left unchanged.
+        """
+        actions_json = json.dumps([[action.wriggler_index, action.wriggler_end.value, action.move_to_cell]
+            for action in actions])
+        final_state_json = json.dumps([list(wriggler.body_cells) for wriggler in final_state.wriggler_list])
+        stats_json = json.dumps(stats)
+        size = len(key) + len(actions_json) + len(final_state_json) + len(stats_json)
+
+        if size > self.max_bytes:
+            # Making room would evict everything else, the entry included
+            return False
+
+        with self.connect() as connection:
+            # Take the write lock up front, so concurrent evictions cannot interleave
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute('INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?)',
+                (key, actions_json, final_state_json, stats_json, size, time.time()))
+
+            total_size = connection.execute('SELECT SUM(size) FROM solutions').fetchone()[0]
+
+            # Evict the least recently used entries, oldest first, never the new entry
+            for evicted_key, evicted_size in connection.execute(
+                    'SELECT key, size FROM solutions WHERE key != ? ORDER BY last_used', (key,)).fetchall():
+                if total_size <= self.max_bytes:
+                    break
+
+                connection.execute('DELETE FROM solutions WHERE key = ?', (evicted_key,))
+                total_size -= evicted_size
+        
+        return True
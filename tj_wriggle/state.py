@@ -1,23 +1,36 @@
 class State:
-    def __init__(self, wriggler_list, empty_coords):
-        """Initializes the TJ-Wriggle State class."""
+    __slots__ = ('wriggler_list', 'occupancy', 'hash_value')
+
+
+    def __init__(self, wriggler_list, occupancy, hash_value):
+        """Initializes the TJ-Wriggle State class.
+        
+        Where wriggler_list is a tuple of Wriggler class instances. Empty cells are
+        not stored: the occupancy member is an int bit mask with bit n set when 
+        cell n contains a wriggler body segment. hash_value is the state's 64-bit 
+        Zobrist fingerprint (see Zobrist.get_state_hash).
+        
+        States are normally built by Puzzle.get_state or Puzzle.get_result.
+        """
         self.wriggler_list = wriggler_list
-        self.empty_coords = empty_coords
+        self.occupancy = occupancy
+        self.hash_value = hash_value
+
 
     def __hash__(self):
-        return int(''.join([str(hash(wriggler)) for wriggler in self.wriggler_list]))
+        return self.hash_value
             
         
     def __eq__(self, other):
-        return hash(self) == hash(other)
+        # Fingerprints settle almost every comparison, the structural check guards
+        #  against collisions
+        return self.hash_value == other.hash_value and \
+               self.occupancy == other.occupancy and \
+               self.wriggler_list == other.wriggler_list
 
     
-    def __contains__(self, coord):
-        """Returns True if the given coordinate contains a Wriggler body segment. 
+    def __contains__(self, cell):
+        """Returns True if the given cell contains a Wriggler body segment. 
         False otherwise.
         """
-        for wriggler in self.wriggler_list:
-            if coord in wriggler:
-                return True
-        
-        return False
+        return (self.occupancy >> cell) & 1 == 1
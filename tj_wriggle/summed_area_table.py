@@ -0,0 +1,32 @@
+class SummedAreaTable:
+    def __init__(self, width, height, cells):
+        """Initializes the SummedAreaTable class, a 2D prefix sum over the puzzle grid
+        counting the given cells, so the number of them in any rectangle is found
+        with four lookups.
+
+        The table is stored flat in row-major order with an extra leading row and
+        column of zeros: entry (x, y) holds the number of cells above and to the
+        left of grid position (x, y), exclusive.
+        """
+        self.stride = width + 1
+        self.table = [0] * ((height + 1) * self.stride)
+
+        for x in range(height):
+            row_count = 0
+
+            for y in range(width):
+                row_count += (x * width + y) in cells
+                self.table[(x + 1) * self.stride + y + 1] = self.table[x * self.stride + y + 1] + row_count
+
+
+    def get_count(self, coord_a, coord_b):
+        """Returns the number of counted cells in the rectangle with top-left corner
+        coord_a and bottom-right corner coord_b, inclusive.
+        """
+        table = self.table
+        top = coord_a.x * self.stride
+        bottom = (coord_b.x + 1) * self.stride
+        left = coord_a.y
+        right = coord_b.y + 1
+
+        return table[bottom + right] - table[top + right] - table[bottom + left] + table[top + left]
@@ -1,26 +1,37 @@
 class Wriggler:
-    def __init__(self, body_coords):
-        """Initializes the Wriggler class."""
-        self.body_coords = body_coords
+    # Wrigglers are immutable, so only a tuple of body cells and its hash are stored 
+    #  per instance, letting unmoved wrigglers be shared between states
+    __slots__ = ('body_cells', 'hash_value')
+
+
+    def __init__(self, body_cells, hash_value):
+        """Initializes the Wriggler class.
+        
+        Where body_cells is a tuple of integer cell IDs (see Puzzle.get_cell) 
+        ordered from head to tail, and hash_value is the body's Zobrist hash
+        (see Zobrist.get_body_hash).
+        """
+        self.body_cells = body_cells
+        self.hash_value = hash_value
         
     
     def __hash__(self):
-        return int(''.join([str(coord.x) + str(coord.y) + str(index) for index, coord in enumerate(self.body_coords)]))
+        return self.hash_value
         
 
     def __eq__(self, other):
-        return hash(self) == hash(other)
+        return self is other or self.body_cells == other.body_cells
         
         
-    def __contains__(self, coord):
-        return coord in self.body_coords
+    def __contains__(self, cell):
+        return cell in self.body_cells
 
     
     def get_head(self):
-        """Returns the head coordinate of this wriggler."""
-        return self.body_coords[0]
+        """Returns the head cell of this wriggler."""
+        return self.body_cells[0]
     
     
     def get_tail(self):
-        """Returns the tail coordinate of this wriggler."""
-        return self.body_coords[-1]
+        """Returns the tail cell of this wriggler."""
+        return self.body_cells[-1]
@@ -0,0 +1,86 @@
+import random
+
+
+# Constants
+# Zobrist keys are drawn from a fixed seed so fingerprints are reproducible across runs
+# and identical in every process working on the same puzzle
+ZOBRIST_SEED = 5400
+HASH_BITS = 64
+HASH_MASK = (1 << HASH_BITS) - 1
+
+
+class Zobrist:
+    def __init__(self, num_cells, num_wrigglers):
+        """Initializes the Zobrist class, which computes 64-bit state 
+        fingerprints that can be updated incrementally as wrigglers move.
+        
+        A wriggler's body hash XORs one random key per body cell, rotated left by 
+        the segment's index, so it depends on the order of the body. A state's hash 
+        XORs each body hash multiplied by a random odd key for that wriggler index.
+        """
+        key_generator = random.Random(ZOBRIST_SEED)
+        self.cell_keys = [key_generator.getrandbits(HASH_BITS) for _ in range(num_cells)]
+        self.wriggler_keys = [key_generator.getrandbits(HASH_BITS) | 1 for _ in range(num_wrigglers)]
+
+
+    @staticmethod
+    def rotate_left(value, amount):
+        """Returns the 64-bit value rotated left by the given amount of bits."""
+        amount %= HASH_BITS
+        return ((value << amount) | (value >> (HASH_BITS - amount))) & HASH_MASK
+    
+    
+    @staticmethod
+    def rotate_right(value, amount):
+        """Returns the 64-bit value rotated right by the given amount of bits."""
+        amount %= HASH_BITS
+        return ((value >> amount) | (value << (HASH_BITS - amount))) & HASH_MASK
+
+
+    def get_body_hash(self, body_cells):
+        """Returns the hash of a wriggler body made up of the given cells,
+        ordered from head to tail.
+        """
+        body_hash = 0
+
+        for segment_index, cell in enumerate(body_cells):
+            body_hash ^= self.rotate_left(self.cell_keys[cell], segment_index)
+        
+        return body_hash
+
+
+    def get_head_move_hash(self, body_hash, body_length, move_to_cell, vacated_cell):
+        """Returns the body hash that results from a wriggler's head moving to 
+        move_to_cell, vacating its tail cell vacated_cell.
+        
+        Every remaining segment's index grows by one, which is a single rotation.
+        """
+        body_hash ^= self.rotate_left(self.cell_keys[vacated_cell], body_length - 1)
+        return self.rotate_left(body_hash, 1) ^ self.cell_keys[move_to_cell]
+
+
+    def get_tail_move_hash(self, body_hash, body_length, move_to_cell, vacated_cell):
+        """Returns the body hash that results from a wriggler's tail moving to 
+        move_to_cell, vacating its head cell vacated_cell.
+        
+        Every remaining segment's index shrinks by one, which is a single rotation.
+        """
+        body_hash = self.rotate_right(body_hash ^ self.cell_keys[vacated_cell], 1)
+        return body_hash ^ self.rotate_left(self.cell_keys[move_to_cell], body_length - 1)
+
+
+    def get_wriggler_term(self, wriggler_index, body_hash):
+        """Returns the contribution of the wriggler with the given index and 
+        body hash to a state hash.
+        """
+        return (body_hash * self.wriggler_keys[wriggler_index]) & HASH_MASK
+
+
+    def get_state_hash(self, wriggler_list):
+        """Returns the hash of a state made up of the given wrigglers."""
+        state_hash = 0
+
+        for wriggler_index, wriggler in enumerate(wriggler_list):
+            state_hash ^= self.get_wriggler_term(wriggler_index, wriggler.hash_value)
+        
+        return state_hash